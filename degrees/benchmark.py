@@ -0,0 +1,128 @@
+import argparse
+import json
+import random
+import resource
+import sys
+import time
+
+import degrees
+
+
+def percentile(samples, fraction):
+    """
+    Return the value at `fraction` (0..1) of the sorted samples.
+    """
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(samples):
+    """
+    Summarize latencies in seconds as milliseconds.
+    """
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+    }
+
+
+def peak_rss_mb():
+    """
+    Return this process's peak resident set size in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def query_pairs(num_queries, seed):
+    """
+    Draw a fixed, seeded set of (source, target) pairs among people
+    who starred in at least one movie.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+
+    def draw():
+        for _ in range(100):
+            person_id = rng.choice(person_ids)
+            if degrees.neighbors_for_person(person_id):
+                return person_id
+        return person_id
+
+    return [(draw(), draw()) for _ in range(num_queries)]
+
+
+def run(directory, methods, num_queries, seed, compact=False, snapshot=False, lean=False):
+    """
+    Load `directory` once and time each search method over the same
+    seeded set of query pairs. Returns a dict of results.
+    """
+    start = time.perf_counter()
+    degrees.load_data(directory, compact=compact, snapshot=snapshot, lean=lean)
+    load_seconds = time.perf_counter() - start
+
+    if "astar" in methods:
+        start = time.perf_counter()
+        degrees.load_landmarks(directory)
+        landmark_seconds = time.perf_counter() - start
+    else:
+        landmark_seconds = None
+
+    queries = query_pairs(num_queries, seed)
+
+    neighbor_times = []
+    for source, _ in queries:
+        start = time.perf_counter()
+        degrees.neighbors_for_person(source)
+        neighbor_times.append(time.perf_counter() - start)
+
+    results = {
+        "directory": directory,
+        "people": len(degrees.people),
+        "movies": len(degrees.movies),
+        "mode": {"compact": compact, "snapshot": snapshot, "lean": lean},
+        "seed": seed,
+        "load_s": round(load_seconds, 3),
+        "landmarks_s": None if landmark_seconds is None else round(landmark_seconds, 3),
+        "neighbors_for_person": summarize(neighbor_times),
+        "methods": {},
+    }
+    for method in methods:
+        times = []
+        connected = 0
+        for source, target in queries:
+            start = time.perf_counter()
+            path = degrees.shortest_path(source, target, method=method)
+            times.append(time.perf_counter() - start)
+            connected += path is not None
+        results["methods"][method] = dict(summarize(times), connected=connected)
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark loading and searching a degrees dataset")
+    parser.add_argument("directory")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--methods", default="bidirectional",
+                        help="comma-separated shortest_path methods to time")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--snapshot", action="store_true")
+    parser.add_argument("--lean", action="store_true")
+    args = parser.parse_args()
+
+    methods = args.methods.split(",")
+    compact = args.compact or any(m in ("astar", "vectorized") for m in methods)
+    results = run(args.directory, methods, args.queries, args.seed,
+                  compact=compact, snapshot=args.snapshot, lean=args.lean)
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
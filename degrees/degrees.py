@@ -1,22 +1,108 @@
+import argparse
 import csv
+import json
+import multiprocessing
 import sys
+import time
+from collections import deque
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import CompactGraph
+from landmarks import Landmarks
+from nameindex import NameSearch
+from records import NameIndex, RecordTable, SortedNameIndex
+from snapshot import load_snapshot, save_snapshot
+from util import Node, NeighborIndex, SearchStats, StackFrontier, QueueFrontier, timed
 
 # Maps names to a set of corresponding person_ids
+# (a records view when loaded as views, see load_data)
 names = {}
 
 # Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
+# (a records.RecordTable view when loaded as views, see load_data)
 people = {}
 
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
+# (a records.RecordTable view when loaded as views, see load_data)
 movies = {}
 
+# CompactGraph holding the star relation when loaded with compact=True
+graph = None
 
-def load_data(directory):
+# Landmarks distance oracle over `graph`, see load_landmarks
+landmarks = None
+
+# NeighborIndex caching neighbors_for_person, see enable_neighbor_index
+neighbor_index = None
+
+# File that changes to the loaded data are appended to, see open_change_log
+change_log = None
+
+# Whether add_person, add_movie, add_star or remove_star changed the data
+# since it was loaded, so files derived from the CSVs no longer match it
+changed = False
+
+# NameSearch over the keys of `names`, built on first prefix or fuzzy lookup
+name_search = None
+
+# Seconds the last load_data call took
+load_seconds = 0.0
+
+
+def load_data(directory, compact=False, snapshot=False, lean=False):
     """
     Load data from CSV files into memory.
+
+    With `compact`, the star relation is stored only in an integer
+    CSR `graph` instead of per-record sets: `people` entries then
+    hold just name and birth, and `movies` entries title and year.
+
+    With `snapshot`, a binary snapshot of the data is memory-mapped
+    from the directory if it is up to date with the CSVs, and written
+    there after parsing otherwise. Loaded with `compact` or `lean`,
+    `names`, `people` and `movies` are then views over the mapped
+    string columns, decoded as they are read; without either, they
+    are copied into dicts.
+
+    With `lean`, the CSVs are streamed row by row into a compact graph
+    plus column lists of interned strings, and `names`, `people` and
+    `movies` become read-only views over those columns.
     """
+    global load_seconds
+    start = time.perf_counter()
+    try:
+        _load_data(directory, compact, snapshot, lean)
+    finally:
+        load_seconds = time.perf_counter() - start
+
+
+def _load_data(directory, compact, snapshot, lean):
+    global names, people, movies, graph, landmarks, name_search, changed
+    graph = None
+    landmarks = None
+    changed = False
+    if neighbor_index is not None:
+        # Keep the index enabled across reloads, but not its entries
+        neighbor_index.clear()
+    name_search = None
+    if lean or not isinstance(people, dict):
+        names, people, movies = {}, {}, {}
+
+    if snapshot:
+        loaded = load_snapshot(directory)
+        if loaded is None:
+            _load_data(directory, True, False, lean)
+            save_snapshot(directory, graph, people, movies)
+        else:
+            graph, person_columns, movie_columns, name_order = loaded
+            _store_columns(person_columns, movie_columns, compact or lean, name_order)
+        if not compact and not lean:
+            _expand_graph()
+        return
+
+    if lean:
+        _load_lean(directory)
+        return
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -24,8 +110,9 @@ def load_data(directory):
             people[row["id"]] = {
                 "name": row["name"],
                 "birth": row["birth"],
-                "movies": set()
             }
+            if not compact:
+                people[row["id"]]["movies"] = set()
             if row["name"].lower() not in names:
                 names[row["name"].lower()] = {row["id"]}
             else:
@@ -38,12 +125,19 @@ def load_data(directory):
             movies[row["id"]] = {
                 "title": row["title"],
                 "year": row["year"],
-                "stars": set()
             }
+            if not compact:
+                movies[row["id"]]["stars"] = set()
 
     # Load stars
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
+        if compact:
+            graph = CompactGraph.build(
+                people, movies,
+                ((row["person_id"], row["movie_id"]) for row in reader)
+            )
+            return
         for row in reader:
             try:
                 people[row["person_id"]]["movies"].add(row["movie_id"])
@@ -52,15 +146,303 @@ def load_data(directory):
                 pass
 
 
+def _load_lean(directory):
+    """
+    Stream the CSVs in `directory` into a compact graph and
+    column lists, then expose them through record views.
+    """
+    global graph
+    intern = sys.intern
+
+    person_ids, person_names, births = [], [], []
+    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        i_id, i_name, i_birth = (header.index(c) for c in ("id", "name", "birth"))
+        for row in reader:
+            person_ids.append(intern(row[i_id]))
+            person_names.append(row[i_name])
+            births.append(intern(row[i_birth]))
+
+    movie_ids, titles, years = [], [], []
+    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        i_id, i_title, i_year = (header.index(c) for c in ("id", "title", "year"))
+        for row in reader:
+            movie_ids.append(intern(row[i_id]))
+            titles.append(row[i_title])
+            years.append(intern(row[i_year]))
+
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        i_person, i_movie = header.index("person_id"), header.index("movie_id")
+        graph = CompactGraph.build(
+            person_ids, movie_ids,
+            ((row[i_person], row[i_movie]) for row in reader)
+        )
+    del person_ids, movie_ids
+
+    _store_columns({"name": person_names, "birth": births},
+                   {"title": titles, "year": years}, views=True)
+
+
+def _store_columns(person_columns, movie_columns, views, name_order=None):
+    """
+    Fill `names`, `people` and `movies` from "name"/"birth" and
+    "title"/"year" columns in `graph` index order, either as dicts or,
+    with `views`, as record views over the columns. `name_order`, the
+    person rows sorted by lowercase name, lets `names` bisect the
+    columns instead of indexing every name up front.
+    """
+    global names, people, movies
+    if not views:
+        for person_id, name, birth in zip(graph.person_ids, person_columns["name"],
+                                          person_columns["birth"]):
+            people[person_id] = {"name": name, "birth": birth}
+            names.setdefault(name.lower(), set()).add(person_id)
+        for movie_id, title, year in zip(graph.movie_ids, movie_columns["title"],
+                                         movie_columns["year"]):
+            movies[movie_id] = {"title": title, "year": year}
+        return
+
+    g = graph
+    if name_order is None:
+        names = NameIndex(g.person_ids)
+        for row, name in enumerate(person_columns["name"]):
+            names.add(name, row)
+    else:
+        names = SortedNameIndex(g.person_ids, person_columns["name"], name_order)
+    people = RecordTable(
+        g.person_index, person_columns,
+        {"movies": lambda p: {g.movie_ids[m] for m in g.movies_of(p)}}
+    )
+    movies = RecordTable(
+        g.movie_index, movie_columns,
+        {"stars": lambda m: {g.person_ids[p] for p in g.stars_of(m)}}
+    )
+
+
+def load_landmarks(directory, k=16):
+    """
+    Load the landmark distances saved next to the dataset in
+    `directory`, computing `k` landmarks and saving them first if
+    they are missing or stale. Requires a compact graph.
+
+    The saved file describes the CSVs, so once the data has been
+    changed (see add_star) landmarks are computed from the current
+    graph and kept in memory only.
+    """
+    global landmarks
+    if graph is None:
+        raise ValueError("landmarks require load_data(..., compact=True)")
+    if changed:
+        landmarks = Landmarks.compute(graph, k)
+        return
+    landmarks = Landmarks.load(directory, graph.num_people())
+    if landmarks is None or landmarks.k != k:
+        landmarks = Landmarks.compute(graph, k)
+        landmarks.save(directory)
+
+
+def distance(source, target):
+    """
+    Returns an estimate of the degrees of separation between two
+    person ids in O(k) time from the loaded landmarks: the length of
+    the shortest route through a landmark. This is never less than the
+    true distance. Returns None if no landmark connects them.
+    """
+    if landmarks is None:
+        raise ValueError("distance requires load_landmarks")
+    return landmarks.upper_bound(graph.person_index[source], graph.person_index[target])
+
+
+def open_change_log(path):
+    """
+    Append every later add_person, add_movie, add_star and
+    remove_star call to the JSON-lines file at `path`, so the changes
+    can be replayed on top of a fresh load or snapshot.
+    """
+    global change_log
+    if change_log is not None:
+        change_log.close()
+    change_log = open(path, "a", encoding="utf-8")
+
+
+def replay_changes(path):
+    """
+    Apply the changes recorded in the change log at `path`, in order.
+    """
+    global change_log
+    operations = {
+        "add_person": add_person,
+        "add_movie": add_movie,
+        "add_star": add_star,
+        "remove_star": remove_star,
+    }
+    log, change_log = change_log, None
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    change = json.loads(line)
+                    operations[change["op"]](*change["args"])
+    finally:
+        change_log = log
+
+
+def add_person(person_id, name, birth=""):
+    """
+    Add a person with no movies. Does nothing if the id is known.
+    """
+    global landmarks, changed
+    if person_id in people:
+        return
+    landmarks = None
+    changed = True
+    if graph is not None:
+        row = graph.add_person(person_id)
+    if isinstance(people, RecordTable):
+        people.columns["name"].append(name)
+        people.columns["birth"].append(birth)
+        names.add(name, row)
+    else:
+        people[person_id] = {"name": name, "birth": birth}
+        if graph is None:
+            people[person_id]["movies"] = set()
+        names.setdefault(name.lower(), set()).add(person_id)
+    if name_search is not None:
+        name_search.add(name.lower())
+    _log_change("add_person", person_id, name, birth)
+
+
+def add_movie(movie_id, title, year=""):
+    """
+    Add a movie with no stars. Does nothing if the id is known.
+    """
+    global changed
+    if movie_id in movies:
+        return
+    changed = True
+    if graph is not None:
+        graph.add_movie(movie_id)
+    if isinstance(movies, RecordTable):
+        movies.columns["title"].append(title)
+        movies.columns["year"].append(year)
+    else:
+        movies[movie_id] = {"title": title, "year": year}
+        if graph is None:
+            movies[movie_id]["stars"] = set()
+    _log_change("add_movie", movie_id, title, year)
+
+
+def add_star(person_id, movie_id):
+    """
+    Record that a known person starred in a known movie.
+    """
+    if graph is not None:
+        graph.add_star(graph.person_index[person_id], graph.movie_index[movie_id])
+    else:
+        people[person_id]["movies"].add(movie_id)
+        movies[movie_id]["stars"].add(person_id)
+    _changed(movie_id)
+    _log_change("add_star", person_id, movie_id)
+
+
+def remove_star(person_id, movie_id):
+    """
+    Record that a person no longer starred in a movie.
+    """
+    if graph is not None:
+        graph.remove_star(graph.person_index[person_id], graph.movie_index[movie_id])
+    else:
+        people[person_id]["movies"].discard(movie_id)
+        movies[movie_id]["stars"].discard(person_id)
+    _changed(movie_id, person_id)
+    _log_change("remove_star", person_id, movie_id)
+
+
+def _changed(movie_id, *extra):
+    """
+    Drop derived data made stale by a change to a movie's cast:
+    the cached neighbors of its stars (and of `extra` people), and
+    the landmark distances, which must be recomputed.
+    """
+    global landmarks, changed
+    landmarks = None
+    changed = True
+    if neighbor_index is None:
+        return
+    if graph is not None:
+        stars = [graph.person_ids[p] for p in graph.stars_of(graph.movie_index[movie_id])]
+    else:
+        stars = movies[movie_id]["stars"]
+    for person_id in list(stars) + list(extra):
+        neighbor_index.discard(person_id)
+
+
+def _log_change(op, *args):
+    if change_log is not None:
+        change_log.write(json.dumps({"op": op, "args": args}) + "\n")
+        change_log.flush()
+
+
+def _expand_graph():
+    """
+    Copy the star relation from the compact `graph` into the
+    per-record "movies" and "stars" sets, then drop the graph.
+    """
+    global graph
+    for m, movie_id in enumerate(graph.movie_ids):
+        movies[movie_id]["stars"] = {graph.person_ids[p] for p in graph.stars_of(m)}
+    for p, person_id in enumerate(graph.person_ids):
+        people[person_id]["movies"] = {graph.movie_ids[m] for m in graph.movies_of(p)}
+    graph = None
+
+
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(usage="python degrees.py [directory] [options]")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--compact", action="store_true",
+                        help="store the star relation as a CSR graph")
+    parser.add_argument("--lean", action="store_true",
+                        help="stream the CSVs into low-memory column views")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="load from / write a binary snapshot of the data")
+    parser.add_argument("--method", default="bidirectional",
+                        choices=["bfs", "bidirectional", "astar", "vectorized"],
+                        help="search used by shortest_path")
+    parser.add_argument("--landmarks", type=int, metavar="K", default=16,
+                        help="number of landmarks used by --method astar")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer tab-separated name pairs from FILE ('-' for stdin)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes answering batch queries")
+    parser.add_argument("--stats", action="store_true",
+                        help="report search counters and timings")
+    args = parser.parse_args()
 
     # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    log = sys.stderr if args.batch else sys.stdout
+    print("Loading data...", file=log)
+    method = args.method
+    compact = args.compact or method in ("astar", "vectorized")
+    load_data(args.directory, compact=compact, snapshot=args.snapshot, lean=args.lean)
+    if method == "astar":
+        load_landmarks(args.directory, args.landmarks)
+    print("Data loaded.", file=log)
+
+    if args.batch:
+        if args.batch == "-":
+            run_batch(sys.stdin, sys.stdout, workers=args.workers, method=method,
+                      stats=args.stats)
+        else:
+            with open(args.batch, encoding="utf-8") as f:
+                run_batch(f, sys.stdout, workers=args.workers, method=method,
+                          stats=args.stats)
+        return
+
     global source
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -70,7 +452,8 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    stats = SearchStats() if args.stats else None
+    path = shortest_path(source, target, method=method, stats=stats)
 
     if path is None:
         print("Not connected.")
@@ -84,9 +467,131 @@ def main():
             person2 = people[path[i + 1][1]]["name"]
             movie = movies[path[i + 1][0]]["title"]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+    if stats is not None:
+        print(stats)
         
 
-def shortest_path(source, target):
+def run_batch(lines, out, workers=1, method="bidirectional", stats=False):
+    """
+    Answer one query per line of `lines`, each a source and target
+    separated by a tab, and write one JSON object per query to `out`.
+
+    Sources and targets may be names or person ids. With more than one
+    worker, queries fan out to forked processes that share the loaded
+    data copy-on-write; results are written in input order. With
+    `stats`, each result also carries the search's SearchStats.
+    """
+    queries = (
+        (line.rstrip("\n").split("\t"), method, stats)
+        for line in lines if line.strip()
+    )
+    if workers > 1:
+        context = multiprocessing.get_context("fork")
+        with context.Pool(workers) as pool:
+            for result in pool.imap(_answer_query, queries, chunksize=64):
+                out.write(result + "\n")
+    else:
+        for query in queries:
+            out.write(_answer_query(query) + "\n")
+
+
+def _answer_query(query):
+    """
+    Resolve and answer a single batch query, returning a JSON line.
+    """
+    fields, method, with_stats = query
+    if len(fields) != 2:
+        return json.dumps({"query": fields, "error": "expected source<TAB>target"})
+    source_name, target_name = fields
+    result = {"source": source_name, "target": target_name}
+
+    start = time.perf_counter()
+    source_id = _resolve_person(source_name)
+    target_id = _resolve_person(target_name)
+    if source_id is None or target_id is None:
+        result["error"] = "person not found or ambiguous"
+    else:
+        stats = SearchStats() if with_stats else None
+        path = shortest_path(source_id, target_id, method=method, stats=stats)
+        result["source_id"] = source_id
+        result["target_id"] = target_id
+        result["degrees"] = None if path is None else len(path)
+        result["path"] = path
+        if stats is not None:
+            result["stats"] = stats.as_dict()
+    result["ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return json.dumps(result)
+
+
+def _resolve_person(name):
+    """
+    Non-interactive lookup of a person id from an id, a unique name,
+    or a name followed by a birth year such as "Kevin Bacon (1958)".
+    """
+    if name in people:
+        return name
+    birth = None
+    if name.endswith(")") and " (" in name:
+        name, _, birth = name[:-1].rpartition(" (")
+    return person_id_for_name(name, birth=birth, interactive=False)
+
+
+def shortest_path(source, target, method="bfs", stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target.
+
+    `method` selects the search: "bfs" expands one node at a time
+    from the source, "bidirectional" grows a frontier from both ends
+    and meets in the middle, "astar" runs A* guided by the
+    landmark lower bounds (see load_landmarks), and "vectorized"
+    expands a whole BFS level at a time with NumPy over the compact
+    graph.
+
+    If a SearchStats is passed as `stats`, it is filled in with the
+    work the search did and the time spent loading, searching and
+    reconstructing the path.
+
+    If no possible path, returns None.
+    """
+    if stats is None:
+        return _shortest_path(source, target, method, None)
+    stats.load_seconds = load_seconds
+    reconstruct_seconds = stats.reconstruct_seconds
+    start = time.perf_counter()
+    try:
+        return _shortest_path(source, target, method, stats)
+    finally:
+        elapsed = time.perf_counter() - start
+        stats.search_seconds += elapsed - (stats.reconstruct_seconds - reconstruct_seconds)
+
+
+def _shortest_path(source, target, method, stats):
+    if method == "bidirectional":
+        if graph is not None:
+            path = bidirectional_search(
+                graph.person_index[source], graph.person_index[target],
+                graph.neighbors, stats
+            )
+        else:
+            return bidirectional_search(source, target, stats=stats)
+    elif method == "astar":
+        if landmarks is None:
+            raise ValueError("astar search requires load_landmarks")
+        path = landmarks.astar(graph, graph.person_index[source], graph.person_index[target], stats)
+    elif method == "vectorized":
+        if graph is None:
+            raise ValueError("vectorized search requires load_data(..., compact=True)")
+        path = graph.level_bfs(graph.person_index[source], graph.person_index[target], stats)
+    elif method == "bfs":
+        return _breadth_first_search(source, target, stats)
+    else:
+        raise ValueError(f"unknown search method: {method}")
+    with timed(stats, "reconstruct_seconds"):
+        return None if path is None else graph.to_ids(path)
+
+
+def _breadth_first_search(source, target, stats):
     num_explored = 0
     frontier = [Node(state=source, parent=None, action=None)]
     frontier_check = [source]
@@ -95,7 +600,7 @@ def shortest_path(source, target):
     
     while True:
         if frontier == []:
-            return ("no solution")
+            return None
         
         node = Node(state=None, parent=None, action=None)
         node = frontier[0]
@@ -103,34 +608,249 @@ def shortest_path(source, target):
         frontier = frontier[1:]
 
         num_explored += 1
+        if stats is not None:
+            stats.expand(1, len(frontier) + 1)
 
         if node.state == target:
-            while node.parent is not None:
-                solve.append((node.action,node.state))
-                node = node.parent
-            solve.reverse()
+            with timed(stats, "reconstruct_seconds"):
+                while node.parent is not None:
+                    solve.append((node.action,node.state))
+                    node = node.parent
+                solve.reverse()
             return (solve)
 
         explored.append(node.state)
    
         
-        for x in range (len(neighbors_for_person(node.state))): 
+        for movie_id, person_id in neighbors_for_person(node.state):
 
-            if not  ( list(neighbors_for_person(node.state))[x][1] in frontier_check ) and not ( list(neighbors_for_person(node.state))[x][1] in explored ) :
-                child = Node(state=list(neighbors_for_person(node.state))[x][1], parent=node, action=list(neighbors_for_person(node.state))[x][0])
+            if not (person_id in frontier_check) and not (person_id in explored):
+                child = Node(state=person_id, parent=node, action=movie_id)
                 frontier.append(child)
-                frontier_check.append(list(neighbors_for_person(node.state))[x][1])
+                frontier_check.append(person_id)
 
 
-def person_id_for_name(name):
+def bidirectional_search(source, target, neighbors=None, stats=None):
+    """
+    Breadth-first search from both `source` and `target` at once,
+    always expanding the smaller frontier by one full level.
+    `neighbors` maps a node to its (action, node) pairs and defaults
+    to `neighbors_for_person`.
+
+    Each side keeps a dict mapping a person_id to the (movie_id,
+    person_id) step that reached it, so membership tests are O(1)
+    and the path can be rebuilt once the two searches touch.
+    """
+    if neighbors is None:
+        neighbors = neighbors_for_person
+    if source == target:
+        return []
+
+    # person_id -> (movie_id, previous person_id) towards source / target
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = deque([source])
+    backward_frontier = deque([target])
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            meet = _expand_level(forward_frontier, forward, backward, neighbors, stats)
+        else:
+            meet = _expand_level(backward_frontier, backward, forward, neighbors, stats)
+        if meet is not None:
+            with timed(stats, "reconstruct_seconds"):
+                return _join_paths(meet, forward, backward)
+
+    return None
+
+
+def _expand_level(frontier, visited, other, neighbors, stats=None):
+    """
+    Expand every node currently in `frontier` by one step, recording
+    parents in `visited`. Return the first person_id that was already
+    reached by the opposite search, or None.
+    """
+    for _ in range(len(frontier)):
+        if stats is not None:
+            stats.expand(1, len(frontier))
+        person = frontier.popleft()
+        for movie_id, person_id in neighbors(person):
+            if person_id in visited:
+                continue
+            visited[person_id] = (movie_id, person)
+            if person_id in other:
+                return person_id
+            frontier.append(person_id)
+    return None
+
+
+def _join_paths(meet, forward, backward):
+    """
+    Build the source-to-target path through `meet` from the parent
+    maps of a bidirectional search.
+    """
+    path = []
+    person = meet
+    while forward[person] is not None:
+        movie_id, previous = forward[person]
+        path.append((movie_id, person))
+        person = previous
+    path.reverse()
+
+    person = meet
+    while backward[person] is not None:
+        movie_id, following = backward[person]
+        path.append((movie_id, following))
+        person = following
+    return path
+
+
+def count_shortest_paths(source, target):
+    """
+    Returns (degrees, count) where `count` is the number of distinct
+    shortest paths of (movie_id, person_id) pairs from source to
+    target, computed in a single BFS without building any path.
+    Returns None if they are not connected.
+    """
+    neighbors, source, target = _search_space(source, target)
+    dag = _shortest_path_dag(source, target, neighbors)
+    if dag is None:
+        return None
+    distances, counts = dag
+    return distances[target], counts[target]
+
+
+def all_shortest_paths(source, target):
+    """
+    Yields every shortest path from source to target, one at a time,
+    in the same (movie_id, person_id) format as shortest_path.
+    Paths are built on demand by walking the BFS DAG back from the
+    target, so only the current path is held in memory.
+    """
+    neighbors, s, t = _search_space(source, target)
+    dag = _shortest_path_dag(s, t, neighbors)
+    if dag is None:
+        return
+    distances, _ = dag
+
+    def walk(person):
+        # Paths from s to `person`, stepping back one BFS level at a time
+        if person == s:
+            yield []
+            return
+        level = distances[person] - 1
+        for movie, previous in neighbors(person):
+            if distances.get(previous) == level:
+                for path in walk(previous):
+                    yield path + [(movie, person)]
+
+    for path in walk(t):
+        yield graph.to_ids(path) if graph is not None else path
+
+
+def neighborhood(source, max_depth=None):
+    """
+    Yields (person_id, distance, via_movie) for everyone within
+    `max_depth` degrees of source (everyone reachable if None), in
+    BFS order, starting with (source, 0, None).
+
+    Since co-starring is symmetric, a person's neighbors all lie in
+    the previous, current or next level, so only those three levels
+    are kept in memory rather than everyone seen so far.
+    """
+    neighbors, start, _ = _search_space(source, source)
+    to_person = graph.person_ids.__getitem__ if graph is not None else None
+    to_movie = graph.movie_ids.__getitem__ if graph is not None else None
+
+    yield source, 0, None
+    previous, current = set(), {start}
+    depth = 0
+    while current and (max_depth is None or depth < max_depth):
+        depth += 1
+        following = {}
+        for person in current:
+            for movie, neighbor in neighbors(person):
+                if neighbor in previous or neighbor in current or neighbor in following:
+                    continue
+                following[neighbor] = movie
+        for neighbor, movie in following.items():
+            if to_person is not None:
+                yield to_person(neighbor), depth, to_movie(movie)
+            else:
+                yield neighbor, depth, movie
+        previous, current = current, set(following)
+
+
+def distance_histogram(source, max_depth=None):
+    """
+    Returns a dict mapping each distance from source to the number
+    of people at that distance, up to `max_depth`.
+    """
+    histogram = {}
+    for _, distance, _ in neighborhood(source, max_depth):
+        histogram[distance] = histogram.get(distance, 0) + 1
+    return histogram
+
+
+def _search_space(source, target):
+    """
+    Returns the neighbor function to search with and the source and
+    target as nodes of it: indexes on the compact graph if loaded,
+    person ids otherwise.
+    """
+    if graph is not None:
+        return graph.neighbors, graph.person_index[source], graph.person_index[target]
+    return neighbors_for_person, source, target
+
+
+def _shortest_path_dag(source, target, neighbors):
+    """
+    Level-by-level BFS from `source` that stops after the level
+    containing `target`. Returns (distances, counts) dicts, where
+    counts[node] is the number of shortest paths reaching node, or
+    None if `target` is unreachable.
+    """
+    distances = {source: 0}
+    counts = {source: 1}
+    frontier = [source]
+    while frontier and target not in distances:
+        level = distances[frontier[0]] + 1
+        next_frontier = []
+        for person in frontier:
+            paths = counts[person]
+            for _, neighbor in neighbors(person):
+                d = distances.get(neighbor)
+                if d is None:
+                    distances[neighbor] = level
+                    counts[neighbor] = paths
+                    next_frontier.append(neighbor)
+                elif d == level:
+                    counts[neighbor] += paths
+        frontier = next_frontier
+    if target not in distances:
+        return None
+    return distances, counts
+
+
+def person_id_for_name(name, birth=None, interactive=True):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    If `birth` is given, only people born that year match. Without
+    `interactive`, an ambiguous name returns None instead of asking.
     """
     person_ids = list(names.get(name.lower(), set()))
+    if birth is not None:
+        person_ids = [
+            person_id for person_id in person_ids
+            if people[person_id]["birth"] == str(birth)
+        ]
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
+        if not interactive:
+            return None
         print(f"Which '{name}'?")
         for person_id in person_ids:
             person = people[person_id]
@@ -148,11 +868,74 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def find_people(prefix, limit=10):
+    """
+    Returns up to `limit` person ids whose name starts with `prefix`,
+    ordered by name.
+    """
+    found = []
+    for name in _name_search().prefix(prefix.lower()):
+        found.extend(sorted(names[name]))
+        if len(found) >= limit:
+            break
+    return found[:limit]
+
+
+def fuzzy_find_people(name, max_distance=2, limit=10):
+    """
+    Returns up to `limit` (person_id, distance) pairs for people whose
+    name is within `max_distance` edits of `name`, closest first.
+    """
+    found = []
+    for match, distance in _name_search().fuzzy(name.lower(), max_distance):
+        found.extend((person_id, distance) for person_id in sorted(names[match]))
+        if len(found) >= limit:
+            break
+    return found[:limit]
+
+
+def _name_search():
+    """
+    Returns the NameSearch over `names`, building it on first use.
+    """
+    global name_search
+    if name_search is None:
+        name_search = NameSearch(names)
+    return name_search
+
+
+def enable_neighbor_index(max_bytes=None, precompute=False):
+    """
+    Route neighbors_for_person through a NeighborIndex, either built
+    for every person up front (`precompute`) or filled on demand and
+    kept under roughly `max_bytes` by evicting least recently used
+    entries. Returns the index so callers can read its counters. The
+    index stays enabled, emptied, when data is loaded again.
+    """
+    global neighbor_index
+    neighbor_index = NeighborIndex(_compute_neighbors, max_bytes=max_bytes)
+    if precompute:
+        neighbor_index.precompute(people)
+    return neighbor_index
+
+
 def neighbors_for_person(person):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
+
+    With a neighbor index enabled the pairs come back as a shared,
+    immutable tuple instead of a fresh set.
     """
+    if neighbor_index is not None:
+        return neighbor_index.get(person)
+    return _compute_neighbors(person)
+
+
+def _compute_neighbors(person):
+    if graph is not None:
+        p = graph.person_index[person]
+        return set(graph.to_ids(graph.neighbors(p)))
     movie_ids = people[person]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -0,0 +1,391 @@
+from array import array
+from collections import deque
+
+from util import timed
+
+# Distance recorded for people unreachable from a BFS source
+UNREACHABLE = 0xFFFF
+
+
+class CompactGraph():
+    """
+    Integer-indexed co-star graph.
+
+    IMDB ids are interned to dense ints (people 0..P-1, movies 0..M-1)
+    and both directions of the star relation are stored in CSR form:
+    the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the
+    stars of movie `m` are
+    `movie_people[movie_offsets[m]:movie_offsets[m + 1]]`.
+    `person_index` and `movie_index` map ids back to indexes; they are
+    built as dicts unless given.
+
+    Changes made after construction (add_person, add_movie, add_star,
+    remove_star) are kept in a small overlay on top of the arrays
+    until `consolidate` folds them in. Only the rows of people and
+    movies in `changed_people` and `changed_movies`, or added since,
+    go through the overlay; all others are still read from the arrays.
+    """
+
+    def __init__(self, person_ids, movie_ids,
+                 person_offsets, person_movies,
+                 movie_offsets, movie_people,
+                 person_index=None, movie_index=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        if person_index is None:
+            person_index = {pid: i for i, pid in enumerate(person_ids)}
+        if movie_index is None:
+            movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        self.person_index = person_index
+        self.movie_index = movie_index
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        self.added_movies = {}
+        self.added_stars = {}
+        self.removed = set()
+        self.changed_people = set()
+        self.changed_movies = set()
+        self.dirty = False
+
+    @classmethod
+    def build(cls, person_ids, movie_ids, stars):
+        """
+        Build a graph from lists of person and movie ids and an
+        iterable of (person_id, movie_id) star pairs. Pairs naming an
+        unknown person or movie are skipped, and duplicates collapse.
+        """
+        person_ids = list(person_ids)
+        movie_ids = list(movie_ids)
+        person_index = {pid: i for i, pid in enumerate(person_ids)}
+        movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        num_people = len(person_ids)
+        num_movies = len(movie_ids)
+
+        # Stream pairs into two int columns, counting movies per person
+        pair_people = array("i")
+        pair_movies = array("i")
+        person_offsets = array("i", bytes(4 * (num_people + 1)))
+        for person_id, movie_id in stars:
+            p = person_index.get(person_id)
+            m = movie_index.get(movie_id)
+            if p is None or m is None:
+                continue
+            pair_people.append(p)
+            pair_movies.append(m)
+            person_offsets[p + 1] += 1
+        for p in range(num_people):
+            person_offsets[p + 1] += person_offsets[p]
+
+        # Counting sort by person
+        cursor = array("i", person_offsets)
+        person_movies = array("i", bytes(4 * len(pair_people)))
+        for p, m in zip(pair_people, pair_movies):
+            person_movies[cursor[p]] = m
+            cursor[p] += 1
+        del pair_people, pair_movies, cursor
+
+        # Sort and deduplicate each person's movies, compacting in place
+        end = 0
+        movie_counts = array("i", bytes(4 * (num_movies + 1)))
+        for p in range(num_people):
+            start = end
+            previous = -1
+            for m in sorted(person_movies[person_offsets[p]:person_offsets[p + 1]]):
+                if m != previous:
+                    person_movies[end] = m
+                    movie_counts[m + 1] += 1
+                    end += 1
+                    previous = m
+            person_offsets[p] = start
+        person_offsets[num_people] = end
+        del person_movies[end:]
+        for m in range(num_movies):
+            movie_counts[m + 1] += movie_counts[m]
+
+        # Counting sort by movie for the reverse direction
+        movie_offsets = array("i", movie_counts)
+        movie_people = array("i", bytes(4 * end))
+        for p in range(num_people):
+            for k in range(person_offsets[p], person_offsets[p + 1]):
+                m = person_movies[k]
+                movie_people[movie_counts[m]] = p
+                movie_counts[m] += 1
+
+        return cls(person_ids, movie_ids,
+                   person_offsets, person_movies,
+                   movie_offsets, movie_people)
+
+    def num_people(self):
+        return len(self.person_ids)
+
+    def num_movies(self):
+        return len(self.movie_ids)
+
+    def movies_of(self, p):
+        """
+        Return the movie indexes person `p` starred in.
+        """
+        if not self.dirty or (p not in self.changed_people and p + 1 < len(self.person_offsets)):
+            return self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]
+        base = []
+        if p + 1 < len(self.person_offsets):
+            base = self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]
+        found = [m for m in base if (p, m) not in self.removed]
+        found.extend(self.added_movies.get(p, ()))
+        return found
+
+    def stars_of(self, m):
+        """
+        Return the person indexes who starred in movie `m`.
+        """
+        if not self.dirty or (m not in self.changed_movies and m + 1 < len(self.movie_offsets)):
+            return self.movie_people[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+        base = []
+        if m + 1 < len(self.movie_offsets):
+            base = self.movie_people[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+        found = [p for p in base if (p, m) not in self.removed]
+        found.extend(self.added_stars.get(m, ()))
+        return found
+
+    def add_person(self, person_id):
+        """
+        Add a person with no movies and return their index.
+        """
+        if person_id not in self.person_index:
+            self.person_index[person_id] = len(self.person_ids)
+            self.person_ids.append(person_id)
+            self.dirty = True
+        return self.person_index[person_id]
+
+    def add_movie(self, movie_id):
+        """
+        Add a movie with no stars and return its index.
+        """
+        if movie_id not in self.movie_index:
+            self.movie_index[movie_id] = len(self.movie_ids)
+            self.movie_ids.append(movie_id)
+            self.dirty = True
+        return self.movie_index[movie_id]
+
+    def add_star(self, p, m):
+        """
+        Record that person `p` starred in movie `m`.
+        """
+        self.dirty = True
+        self.changed_people.add(p)
+        self.changed_movies.add(m)
+        if (p, m) in self.removed:
+            self.removed.discard((p, m))
+        elif m not in self.movies_of(p):
+            self.added_movies.setdefault(p, set()).add(m)
+            self.added_stars.setdefault(m, set()).add(p)
+
+    def remove_star(self, p, m):
+        """
+        Record that person `p` no longer starred in movie `m`.
+        """
+        self.dirty = True
+        self.changed_people.add(p)
+        self.changed_movies.add(m)
+        if m in self.added_movies.get(p, ()):
+            self.added_movies[p].discard(m)
+            self.added_stars[m].discard(p)
+        elif m in self.movies_of(p):
+            self.removed.add((p, m))
+
+    def consolidate(self):
+        """
+        Rebuild the CSR arrays with all pending changes applied.
+
+        Every row is already sorted, so the changed pairs are deleted
+        from and inserted into each direction with NumPy in one pass
+        over the arrays, without rebuilding from the star pairs.
+        """
+        if not self.dirty:
+            return
+        import numpy as np
+
+        person_offsets, person_movies, movie_offsets, movie_people = self.numpy_arrays()
+        removed = np.array(sorted(self.removed), dtype=np.int64).reshape(-1, 2)
+        added = np.array([(p, m) for p, found in self.added_movies.items() for m in found],
+                         dtype=np.int64).reshape(-1, 2)
+        self.person_offsets, self.person_movies = _patch(
+            person_offsets, person_movies, self.num_people(), self.num_movies(),
+            removed, added)
+        self.movie_offsets, self.movie_people = _patch(
+            movie_offsets, movie_people, self.num_movies(), self.num_people(),
+            removed[:, ::-1], added[:, ::-1])
+        self.added_movies.clear()
+        self.added_stars.clear()
+        self.removed.clear()
+        self.changed_people.clear()
+        self.changed_movies.clear()
+        self.dirty = False
+        self._numpy_arrays = None
+
+    def neighbors(self, p):
+        """
+        Yield (movie, person) index pairs for everyone who
+        starred with person `p`.
+        """
+        if self.dirty:
+            for m in self.movies_of(p):
+                for q in self.stars_of(m):
+                    if q != p:
+                        yield m, q
+            return
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        for k in range(self.person_offsets[p], self.person_offsets[p + 1]):
+            m = person_movies[k]
+            for j in range(movie_offsets[m], movie_offsets[m + 1]):
+                q = movie_people[j]
+                if q != p:
+                    yield m, q
+
+    def to_ids(self, path):
+        """
+        Convert a path of (movie, person) indexes to IMDB ids.
+        """
+        return [(self.movie_ids[m], self.person_ids[p]) for m, p in path]
+
+    def distances_from(self, p):
+        """
+        Return an array of BFS distances (in degrees) from person `p`
+        to every person, with UNREACHABLE for people not connected.
+        Each movie is expanded at most once.
+        """
+        distances = array("H", [UNREACHABLE]) * self.num_people()
+        seen_movies = bytearray(self.num_movies())
+        distances[p] = 0
+        queue = deque([p])
+        while queue:
+            person = queue.popleft()
+            d = distances[person] + 1
+            for m in self.movies_of(person):
+                if seen_movies[m]:
+                    continue
+                seen_movies[m] = 1
+                for q in self.stars_of(m):
+                    if distances[q] == UNREACHABLE:
+                        distances[q] = d
+                        queue.append(q)
+        return distances
+
+    def level_bfs(self, source, target, stats=None):
+        """
+        Frontier-at-a-time BFS between person indexes using NumPy.
+
+        Each level expands the whole frontier to its unseen movies and
+        then to their unvisited stars with array operations, recording
+        parent pointers in int arrays. Returns a list of (movie, person)
+        index pairs or None. Pending changes are consolidated first,
+        which copies the arrays once (see consolidate).
+        Each level counts as one (batched) neighbor call in `stats`.
+        """
+        import numpy as np
+
+        self.consolidate()
+        person_offsets, person_movies, movie_offsets, movie_people = self.numpy_arrays()
+        parent_person = np.full(self.num_people(), -1, dtype=np.int32)
+        parent_movie = np.full(self.num_people(), -1, dtype=np.int32)
+        movie_owner = np.full(self.num_movies(), -1, dtype=np.int32)
+        visited = np.zeros(self.num_people(), dtype=bool)
+        visited[source] = True
+
+        frontier = np.array([source], dtype=np.int32)
+        while not visited[target] and frontier.size:
+            if stats is not None:
+                stats.expand(int(frontier.size), int(frontier.size), neighbor_calls=1)
+            # People to movies, keeping the first frontier person per movie
+            found, owners = _expand(person_offsets, person_movies, frontier)
+            fresh = movie_owner[found] == -1
+            found, first = np.unique(found[fresh], return_index=True)
+            movie_owner[found] = owners[fresh][first]
+
+            # Movies to people, keeping the first movie per person
+            found, via = _expand(movie_offsets, movie_people, found)
+            fresh = ~visited[found]
+            frontier, first = np.unique(found[fresh], return_index=True)
+            via = via[fresh][first]
+            visited[frontier] = True
+            parent_movie[frontier] = via
+            parent_person[frontier] = movie_owner[via]
+
+        if not visited[target]:
+            return None
+        with timed(stats, "reconstruct_seconds"):
+            path = []
+            person = target
+            while person != source:
+                path.append((int(parent_movie[person]), int(person)))
+                person = parent_person[person]
+            path.reverse()
+        return path
+
+    def numpy_arrays(self):
+        """
+        Return the CSR arrays as NumPy views, created once and cached.
+        """
+        if getattr(self, "_numpy_arrays", None) is None:
+            import numpy as np
+            self._numpy_arrays = tuple(
+                np.frombuffer(getattr(self, name), dtype=np.int32)
+                for name in ("person_offsets", "person_movies",
+                             "movie_offsets", "movie_people")
+            )
+        return self._numpy_arrays
+
+
+def _expand(offsets, targets, nodes):
+    """
+    Gather the CSR rows of every node in `nodes` at once, returning
+    the concatenated targets and, for each, the node it came from.
+    """
+    import numpy as np
+
+    starts = offsets[nodes]
+    counts = offsets[nodes + 1] - starts
+    total = int(counts.sum())
+    owners = np.repeat(nodes, counts)
+    shifts = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return targets[shifts + np.arange(total, dtype=np.int32)], owners
+
+
+def _patch(offsets, targets, num_rows, num_columns, removed, added):
+    """
+    Return CSR (offsets, targets) as int arrays for `num_rows` rows
+    after deleting the (row, column) pairs in `removed`, which must
+    be present, and inserting those in `added`, which must not be.
+    Rows are kept sorted, so each pair is found by bisection on
+    row * num_columns + column.
+    """
+    import numpy as np
+
+    rows = np.repeat(np.arange(len(offsets) - 1, dtype=np.int64), np.diff(offsets))
+    num_columns = max(num_columns, 1)
+    keys = rows * num_columns + targets
+    if len(removed):
+        keys = np.delete(keys, np.searchsorted(keys, removed[:, 0] * num_columns + removed[:, 1]))
+    if len(added):
+        inserted = np.sort(added[:, 0] * num_columns + added[:, 1])
+        keys = np.insert(keys, np.searchsorted(keys, inserted), inserted)
+
+    patched = np.zeros(num_rows + 1, dtype=np.int32)
+    np.cumsum(np.bincount(keys // num_columns, minlength=num_rows), out=patched[1:])
+    return _int_array(patched), _int_array(keys % num_columns)
+
+
+def _int_array(values):
+    """
+    Copy a NumPy array into an array("i").
+    """
+    import numpy as np
+
+    result = array("i")
+    result.frombytes(values.astype(np.int32).tobytes())
+    return result
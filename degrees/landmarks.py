@@ -0,0 +1,227 @@
+import heapq
+import json
+import os
+import struct
+import sys
+from array import array
+
+from graph import UNREACHABLE
+from snapshot import source_stamps
+from util import timed
+
+MAGIC = b"DEGLAND1"
+FILENAME = "degrees.landmarks"
+
+
+class Landmarks():
+    """
+    BFS distances from a handful of landmark people, used as an
+    ALT (A*, landmarks, triangle inequality) distance oracle.
+
+    `distances[i]` is an array of distances from `landmarks[i]` to
+    every person index of the graph they were computed on. `k` is the
+    number of landmarks asked for; fewer are kept when the graph runs
+    out of people worth picking.
+    """
+
+    def __init__(self, landmarks, distances, k):
+        self.landmarks = landmarks
+        self.distances = distances
+        self.k = k
+
+    @classmethod
+    def compute(cls, graph, k):
+        """
+        Pick up to `k` landmarks and run a BFS from each.
+
+        Landmarks are shared out between connected components in turn
+        to whichever has most people per landmark so far, so a large
+        component gets most of them but a second large one is not left
+        without any. Within a component the first landmark is the
+        person with most movies, and every later one is the person
+        farthest from the landmarks already there, which spreads them
+        out.
+        """
+        members = _components(graph)
+        shares = [0] * len(members)
+        queue = [(-len(people), c) for c, people in enumerate(members) if len(people) > 1]
+        heapq.heapify(queue)
+        for _ in range(min(k, graph.num_people())):
+            if not queue:
+                break
+            _, c = heapq.heappop(queue)
+            shares[c] += 1
+            if shares[c] < len(members[c]):
+                heapq.heappush(queue, (-len(members[c]) / (shares[c] + 1), c))
+
+        landmarks = []
+        distances = []
+        for c, share in enumerate(shares):
+            if not share:
+                continue
+            people = members[c]
+            candidate = max(people, key=lambda p: len(graph.movies_of(p)))
+            nearest = None
+            for _ in range(share):
+                landmarks.append(candidate)
+                distances.append(graph.distances_from(candidate))
+                row = distances[-1]
+                if nearest is None:
+                    nearest = {p: row[p] for p in people}
+                else:
+                    for p in people:
+                        if row[p] < nearest[p]:
+                            nearest[p] = row[p]
+                candidate = max(people, key=nearest.__getitem__)
+        return cls(landmarks, distances, k)
+
+    def lower_bound(self, a, b):
+        """
+        Return a lower bound on the distance between person indexes
+        `a` and `b`, or None if a landmark proves they are unconnected.
+        """
+        bound = 0
+        for row in self.distances:
+            da, db = row[a], row[b]
+            if da == UNREACHABLE or db == UNREACHABLE:
+                if da != db:
+                    return None
+                continue
+            bound = max(bound, abs(da - db))
+        return bound
+
+    def upper_bound(self, a, b):
+        """
+        Return an upper bound on the distance between `a` and `b`
+        through the best landmark, or None if no landmark reaches both.
+        """
+        bound = None
+        for row in self.distances:
+            da, db = row[a], row[b]
+            if da == UNREACHABLE or db == UNREACHABLE:
+                continue
+            if bound is None or da + db < bound:
+                bound = da + db
+        return bound
+
+    def astar(self, graph, source, target, stats=None):
+        """
+        A* search between person indexes guided by `lower_bound`.
+        Returns a list of (movie, person) index pairs or None, and
+        records its work in the SearchStats `stats` if given.
+        """
+        if source == target:
+            return []
+        h = self.lower_bound(source, target)
+        if h is None:
+            return None
+        parents = {source: None}
+        cost = {source: 0}
+        heap = [(h, 0, source)]
+        while heap:
+            _, g, person = heapq.heappop(heap)
+            if g > cost[person]:
+                continue
+            if stats is not None:
+                stats.expand(1, len(heap) + 1)
+            if person == target:
+                with timed(stats, "reconstruct_seconds"):
+                    path = []
+                    while parents[person] is not None:
+                        movie, previous = parents[person]
+                        path.append((movie, person))
+                        person = previous
+                    path.reverse()
+                return path
+            for movie, neighbor in graph.neighbors(person):
+                if neighbor in cost and cost[neighbor] <= g + 1:
+                    continue
+                h = self.lower_bound(neighbor, target)
+                if h is None:
+                    continue
+                cost[neighbor] = g + 1
+                parents[neighbor] = (movie, person)
+                heapq.heappush(heap, (g + 1 + h, g + 1, neighbor))
+        return None
+
+    def save(self, directory):
+        """
+        Write the landmarks next to the dataset in `directory`,
+        stamped with the current state of its CSVs.
+        """
+        header = json.dumps({
+            "byteorder": sys.byteorder,
+            "sources": source_stamps(directory),
+            "k": self.k,
+            "landmarks": self.landmarks,
+        }).encode("utf-8")
+        path = os.path.join(directory, FILENAME)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            for row in self.distances:
+                row.tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, directory, num_people):
+        """
+        Read landmarks saved in `directory`, or return None if they
+        are missing or stale.
+        """
+        path = os.path.join(directory, FILENAME)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (length,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(length).decode("utf-8"))
+            if header["byteorder"] != sys.byteorder:
+                return None
+            try:
+                if header["sources"] != source_stamps(directory):
+                    return None
+            except FileNotFoundError:
+                return None
+            distances = []
+            for _ in header["landmarks"]:
+                row = array("H")
+                try:
+                    row.fromfile(f, num_people)
+                except EOFError:
+                    return None
+                distances.append(row)
+        return cls(header["landmarks"], distances, header.get("k"))
+
+
+def _components(graph):
+    """
+    Return the connected components of `graph` as lists of people.
+    """
+    labels = array("i", [-1]) * graph.num_people()
+    seen_movies = bytearray(graph.num_movies())
+    members = []
+    for start in range(graph.num_people()):
+        if labels[start] != -1:
+            continue
+        c = len(members)
+        labels[start] = c
+        people = [start]
+        i = 0
+        while i < len(people):
+            for m in graph.movies_of(people[i]):
+                if seen_movies[m]:
+                    continue
+                seen_movies[m] = 1
+                for q in graph.stars_of(m):
+                    if labels[q] == -1:
+                        labels[q] = c
+                        people.append(q)
+            i += 1
+        members.append(people)
+    return members
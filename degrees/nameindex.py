@@ -0,0 +1,247 @@
+from bisect import bisect_left, insort
+from functools import lru_cache
+from itertools import compress, repeat
+
+# Largest edit distance the segment index answers; fuzzy lookups with
+# a larger max_distance fall back to walking the sorted names
+INDEXED_DISTANCE = 2
+
+# Names shorter than this are also cut a second way, see _partitions
+SHORT_NAME = 12
+
+
+class NameSearch():
+    """
+    Sorted array of lowercase names supporting prefix and
+    typo-tolerant lookups.
+
+    Fuzzy search uses a segment index built on first use: every name
+    is cut into INDEXED_DISTANCE + 1 segments, and since each edit
+    touches at most one segment, a name within that many edits of the
+    query has a segment that appears unchanged in the query, shifted
+    by at most that many characters. Looking up those few substrings
+    of the query yields a short list of candidates, which are checked
+    with a bit-parallel edit distance. Short names, whose segments are
+    only a few characters long, are also cut at a second set of points
+    and must match under both cuts.
+    """
+
+    def __init__(self, keys):
+        self.keys = sorted(keys)
+        self.segments = None
+        self.short = None
+
+    def add(self, key):
+        i = bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            insort(self.keys, key, lo=i)
+            if self.segments is not None:
+                self._index(key)
+
+    def prefix(self, prefix, limit=None):
+        """
+        Return names starting with `prefix`, in sorted order.
+        """
+        found = []
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and self.keys[i].startswith(prefix):
+            found.append(self.keys[i])
+            if limit is not None and len(found) == limit:
+                break
+            i += 1
+        return found
+
+    def fuzzy(self, query, max_distance=2, limit=None):
+        """
+        Return (name, distance) pairs for names within `max_distance`
+        edits (insertions, deletions, substitutions) of `query`,
+        closest first.
+        """
+        if max_distance > INDEXED_DISTANCE:
+            found = self._walk(query, max_distance)
+        else:
+            # Every character of a name that the query lacks costs an
+            # edit; this filter runs entirely in C over the candidates
+            candidates = list(self._candidates(query))
+            missing = dict.fromkeys(map(ord, query))
+            kept = map(max_distance.__ge__, map(len, map(str.translate, candidates, repeat(missing))))
+            pattern = _bit_pattern(query)
+            found = []
+            for key in compress(candidates, kept):
+                distance = _distance(pattern, key)
+                if distance <= max_distance:
+                    found.append((key, distance))
+
+        found.sort(key=lambda match: (match[1], match[0]))
+        return found if limit is None else found[:limit]
+
+    def _candidates(self, query):
+        """
+        Return the names that, under every way they are cut, have a
+        segment found in `query` near its own position, plus all names
+        too short to be cut into segments.
+        """
+        if self.segments is None:
+            self.segments = {}
+            self.short = []
+            for key in self.keys:
+                self._index(key)
+
+        tau = INDEXED_DISTANCE
+        candidates = set(self.short)
+        for length in range(max(tau + 1, len(query) - tau), len(query) + tau + 1):
+            delta = len(query) - length
+            common = None
+            for cut, segments in enumerate(_partitions(length)):
+                matched = set()
+                for i, (start, size) in enumerate(segments):
+                    postings = self.segments.get((length, cut, i))
+                    if postings is None:
+                        continue
+                    # At most i edits come before segment i and tau - i after it
+                    low = max(0, start - i, start + delta - (tau - i))
+                    high = min(len(query) - size, start + i, start + delta + (tau - i))
+                    for position in range(low, high + 1):
+                        posting = postings.get(query[position:position + size])
+                        if posting is None:
+                            continue
+                        if isinstance(posting, str):
+                            matched.add(posting)
+                        else:
+                            matched.update(posting)
+                common = matched if common is None else common & matched
+            candidates |= common
+        return candidates
+
+    def _index(self, key):
+        if len(key) <= INDEXED_DISTANCE:
+            self.short.append(key)
+            return
+        for cut, segments in enumerate(_partitions(len(key))):
+            for i, (start, size) in enumerate(segments):
+                postings = self.segments.setdefault((len(key), cut, i), {})
+                # A single name is stored bare, more share a list
+                segment = key[start:start + size]
+                posting = postings.get(segment)
+                if posting is None:
+                    postings[segment] = key
+                elif isinstance(posting, str):
+                    postings[segment] = [posting, key]
+                else:
+                    posting.append(key)
+
+    def _walk(self, query, max_distance):
+        """
+        Return (name, distance) pairs within `max_distance` of `query`
+        by walking the sorted names as an implicit trie: the
+        edit-distance rows for a shared prefix are reused between
+        neighbouring names, and once every entry of a row exceeds the
+        allowed distance, all names with that prefix are skipped with
+        a single bisect.
+        """
+        keys = self.keys
+        found = []
+        rows = [list(range(len(query) + 1))]
+        previous = ""
+        i = 0
+        while i < len(keys):
+            key = keys[i]
+
+            # Reuse the rows computed for the prefix shared with the previous name
+            common = 0
+            limit_common = min(len(key), len(previous), len(rows) - 1)
+            while common < limit_common and key[common] == previous[common]:
+                common += 1
+            del rows[common + 1:]
+
+            pruned = False
+            for depth in range(common, len(key)):
+                last = rows[-1]
+                char = key[depth]
+                row = [last[0] + 1]
+                for j in range(1, len(query) + 1):
+                    row.append(min(
+                        row[j - 1] + 1,
+                        last[j] + 1,
+                        last[j - 1] + (query[j - 1] != char)
+                    ))
+                rows.append(row)
+                if min(row) > max_distance:
+                    # No name with this prefix can match: skip them all
+                    stem = key[:depth + 1]
+                    previous = stem
+                    i = bisect_left(keys, stem[:-1] + chr(ord(stem[-1]) + 1), i + 1)
+                    pruned = True
+                    break
+            if pruned:
+                continue
+
+            previous = key
+            if rows[-1][-1] <= max_distance:
+                found.append((key, rows[-1][-1]))
+            i += 1
+        return found
+
+
+@lru_cache(maxsize=None)
+def _partitions(length):
+    """
+    Return the ways a name of `length` characters is cut into
+    INDEXED_DISTANCE + 1 segments, each as a tuple of (start, size).
+    Segments are as even as possible, the later ones one longer when
+    the length does not divide evenly. Names shorter than SHORT_NAME
+    are cut a second time with every cut point one character later.
+    """
+    count = INDEXED_DISTANCE + 1
+    size, longer = divmod(length, count)
+    cuts = [0]
+    for i in range(count):
+        cuts.append(cuts[-1] + size + (i >= count - longer))
+    partitions = [cuts]
+    if length < SHORT_NAME and cuts[-2] + 1 < length:
+        partitions.append([0] + [cut + 1 for cut in cuts[1:-1]] + [length])
+    return tuple(
+        tuple((cuts[i], cuts[i + 1] - cuts[i]) for i in range(count))
+        for cuts in partitions
+    )
+
+
+def _bit_pattern(query):
+    """
+    Return the per-character bit masks of `query` used by _distance:
+    bit j of masks[c] is set when query[j] == c.
+    """
+    masks = {}
+    for j, char in enumerate(query):
+        masks[char] = masks.get(char, 0) | (1 << j)
+    return masks, len(query)
+
+
+def _distance(pattern, key):
+    """
+    Return the edit distance between the query of `pattern` and
+    `key`, computed a column at a time with the bit-parallel
+    algorithm of Myers, as adapted by Hyyrö to whole-string distance.
+    """
+    masks, length = pattern
+    if length == 0:
+        return len(key)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    positive, negative = full, 0
+    score = length
+    for char in key:
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        up = negative | ~(horizontal | positive)
+        down = positive & horizontal
+        if up & last:
+            score += 1
+        elif down & last:
+            score -= 1
+        up = ((up << 1) | 1) & full
+        down = (down << 1) & full
+        positive = (down | ~(vertical | up)) & full
+        negative = up & vertical
+    return score
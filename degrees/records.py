@@ -0,0 +1,209 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, Sequence
+
+
+class RecordTable(Mapping):
+    """
+    Read-only mapping from an IMDB id to a Record view over
+    parallel column lists, so `people[person_id]["name"]` keeps
+    working without a dict per person.
+
+    `index` maps ids to row numbers, `columns` maps field names to
+    lists, and `related` optionally maps a field name to a function
+    computing that field from a row number on demand.
+    """
+
+    def __init__(self, index, columns, related=None):
+        self.index = index
+        self.columns = columns
+        self.related = related or {}
+
+    def __getitem__(self, key):
+        return Record(self, self.index[key])
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+
+class Record(Mapping):
+    """
+    A single row of a RecordTable.
+    """
+
+    __slots__ = ("table", "row")
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    def __getitem__(self, key):
+        column = self.table.columns.get(key)
+        if column is not None:
+            return column[self.row]
+        related = self.table.related.get(key)
+        if related is not None:
+            return related(self.row)
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from self.table.columns
+        yield from self.table.related
+
+    def __len__(self):
+        return len(self.table.columns) + len(self.table.related)
+
+
+class NameIndex(Mapping):
+    """
+    Read-only mapping from a lowercase name to the set of matching
+    person ids. A unique name stores a bare row number and only
+    shared names pay for a tuple.
+    """
+
+    def __init__(self, person_ids):
+        self.person_ids = person_ids
+        self.rows = {}
+
+    def add(self, name, row):
+        key = name.lower()
+        existing = self.rows.get(key)
+        if existing is None:
+            self.rows[key] = row
+        elif isinstance(existing, tuple):
+            self.rows[key] = existing + (row,)
+        else:
+            self.rows[key] = (existing, row)
+
+    def __getitem__(self, key):
+        rows = self.rows[key]
+        if isinstance(rows, tuple):
+            return {self.person_ids[row] for row in rows}
+        return {self.person_ids[rows]}
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class StringColumn(Sequence):
+    """
+    Read-only list of strings stored back to back as UTF-8 in `data`,
+    string `i` spanning `data[offsets[i]:offsets[i + 1]]`, each decoded
+    only when read. Strings appended later are kept in a plain list.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+        self.stored = len(offsets) - 1
+        self.added = []
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+            if i < 0:
+                raise IndexError(i)
+        if i >= self.stored:
+            return self.added[i - self.stored]
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __len__(self):
+        return self.stored + len(self.added)
+
+    def append(self, value):
+        self.added.append(value)
+
+
+class SortedIndex(Mapping):
+    """
+    Mapping from each string of `column` to its row, found by
+    bisecting `order`, the stored rows sorted by their string. Rows
+    assigned later are kept in a dict.
+    """
+
+    def __init__(self, column, order):
+        self.column = column
+        self.order = order
+        self.added = {}
+
+    def __getitem__(self, key):
+        row = self.added.get(key)
+        if row is not None:
+            return row
+        i = bisect_left(self.order, key, key=self.column.__getitem__)
+        if i < len(self.order) and self.column[self.order[i]] == key:
+            return self.order[i]
+        raise KeyError(key)
+
+    def __setitem__(self, key, row):
+        self.added[key] = row
+
+    def __iter__(self):
+        return iter(self.column)
+
+    def __len__(self):
+        return len(self.column)
+
+
+class SortedNameIndex(Mapping):
+    """
+    Read-only mapping from a lowercase name to the set of matching
+    person ids, like NameIndex, but found by bisecting `order`, the
+    stored rows sorted by lowercase name, so nothing is built up
+    front. Names added later go to a NameIndex.
+    """
+
+    def __init__(self, person_ids, names, order):
+        self.person_ids = person_ids
+        self.names = names
+        self.order = order
+        self.added = NameIndex(person_ids)
+        self.count = None
+
+    def add(self, name, row):
+        self.added.add(name, row)
+        self.count = None
+
+    def __getitem__(self, key):
+        lower = self._lower
+        low = bisect_left(self.order, key, key=lower)
+        high = bisect_right(self.order, key, lo=low, key=lower)
+        found = {self.person_ids[row] for row in self.order[low:high]}
+        if key in self.added:
+            found |= self.added[key]
+        if not found:
+            raise KeyError(key)
+        return found
+
+    def __iter__(self):
+        previous = None
+        for row in self.order:
+            key = self._lower(row)
+            if key != previous:
+                yield key
+                previous = key
+        for key in self.added:
+            if not self._stored(key):
+                yield key
+
+    def __len__(self):
+        if self.count is None:
+            self.count = sum(1 for _ in self)
+        return self.count
+
+    def _lower(self, row):
+        return self.names[row].lower()
+
+    def _stored(self, key):
+        i = bisect_left(self.order, key, key=self._lower)
+        return i < len(self.order) and self._lower(self.order[i]) == key
@@ -0,0 +1,160 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from graph import CompactGraph
+from records import SortedIndex, StringColumn
+
+MAGIC = b"DEGSNAP2"
+FILENAME = "degrees.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+ARRAYS = ("person_offsets", "person_movies", "movie_offsets", "movie_people")
+PERSON_COLUMNS = ("name", "birth")
+MOVIE_COLUMNS = ("title", "year")
+
+
+def snapshot_path(directory):
+    return os.path.join(directory, FILENAME)
+
+
+def source_stamps(directory):
+    """
+    Return the (mtime_ns, size) of each source CSV in `directory`.
+    """
+    stamps = {}
+    for name in SOURCES:
+        st = os.stat(os.path.join(directory, name))
+        stamps[name] = [st.st_mtime_ns, st.st_size]
+    return stamps
+
+
+def save_snapshot(directory, graph, people, movies):
+    """
+    Write `graph` and the person/movie records to the snapshot file
+    in `directory`, stamped with the current state of the source CSVs.
+
+    Layout: MAGIC, an 8-byte header length, a JSON header, then
+    sections at 8-byte aligned offsets: each CSR array; each string
+    column (ids, then the record fields in graph index order) as an
+    int64 offsets section and a UTF-8 data section; and the rows
+    sorted by id and by lowercase name, as int32 arrays.
+    """
+    person_ids, movie_ids = list(graph.person_ids), list(graph.movie_ids)
+    columns = [("person_ids", person_ids), ("movie_ids", movie_ids)]
+    for field in PERSON_COLUMNS:
+        columns.append((f"people.{field}", [people[pid][field] for pid in person_ids]))
+    for field in MOVIE_COLUMNS:
+        columns.append((f"movies.{field}", [movies[mid][field] for mid in movie_ids]))
+    names = columns[2][1]
+
+    blobs = []
+    for name in ARRAYS:
+        blobs.append((name, memoryview(getattr(graph, name)).cast("B")))
+    for name, values in columns:
+        offsets, data = _pack_strings(values)
+        blobs.append((f"{name}.offsets", memoryview(offsets).cast("B")))
+        blobs.append((f"{name}.data", data))
+    for name, values, key in (("person_order", person_ids, None),
+                              ("movie_order", movie_ids, None),
+                              ("name_order", names, str.lower)):
+        order = array("i", sorted(range(len(values)),
+                                  key=values.__getitem__ if key is None
+                                  else lambda row: key(values[row])))
+        blobs.append((name, memoryview(order).cast("B")))
+
+    header = {
+        "byteorder": sys.byteorder,
+        "sources": source_stamps(directory),
+        "sections": {},
+    }
+    offset = 0
+    for name, blob in blobs:
+        header["sections"][name] = [offset, len(blob)]
+        offset += _padded(len(blob))
+    encoded = json.dumps(header).encode("utf-8")
+    base = _padded(len(MAGIC) + 8 + len(encoded))
+
+    path = snapshot_path(directory)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(encoded)))
+        f.write(encoded)
+        f.write(bytes(base - f.tell()))
+        for name, blob in blobs:
+            f.write(blob)
+            f.write(bytes(_padded(len(blob)) - len(blob)))
+    os.replace(tmp, path)
+
+
+def load_snapshot(directory):
+    """
+    Memory-map the snapshot in `directory` and return
+    (graph, person_columns, movie_columns, name_order), or None if it
+    is missing or stale. The columns map "name"/"birth" and
+    "title"/"year" to records.StringColumn views in graph index
+    order, and `name_order` lists person rows by lowercase name.
+
+    Every section is a read-only view into the mapping, decoded only
+    when read, so loading takes no time to speak of and every process
+    loading the same snapshot shares one page-cached copy. The id
+    indexes of the graph are records.SortedIndex views as well.
+    """
+    path = snapshot_path(directory)
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return None
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length).decode("utf-8"))
+        if header["byteorder"] != sys.byteorder:
+            return None
+        try:
+            if header["sources"] != source_stamps(directory):
+                return None
+        except FileNotFoundError:
+            return None
+        base = _padded(len(MAGIC) + 8 + length)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    sections = header["sections"]
+
+    def section(name):
+        start, size = sections[name]
+        return view[base + start:base + start + size]
+
+    def column(name):
+        return StringColumn(section(f"{name}.offsets").cast("q"), section(f"{name}.data"))
+
+    person_ids, movie_ids = column("person_ids"), column("movie_ids")
+    arrays = [section(name).cast("i") for name in ARRAYS]
+    graph = CompactGraph(
+        person_ids, movie_ids, *arrays,
+        person_index=SortedIndex(person_ids, section("person_order").cast("i")),
+        movie_index=SortedIndex(movie_ids, section("movie_order").cast("i")),
+    )
+    person_columns = {field: column(f"people.{field}") for field in PERSON_COLUMNS}
+    movie_columns = {field: column(f"movies.{field}") for field in MOVIE_COLUMNS}
+    return graph, person_columns, movie_columns, section("name_order").cast("i")
+
+
+def _pack_strings(values):
+    """
+    Return (offsets, data) for a StringColumn holding `values`.
+    """
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = array("q", [0])
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    return offsets, b"".join(encoded)
+
+
+def _padded(size):
+    return (size + 7) & ~7
@@ -0,0 +1,99 @@
+import argparse
+import csv
+import os
+import random
+from itertools import accumulate
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael",
+    "Linda", "William", "Elizabeth", "David", "Barbara", "Richard", "Susan",
+    "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen", "Daniel",
+    "Nancy", "Matthew", "Lisa", "Anthony", "Betty", "Mark", "Margaret",
+    "Donald", "Sandra", "Steven", "Ashley", "Paul", "Kimberly", "Andrew",
+    "Emily", "Joshua", "Donna", "Kenneth", "Michelle", "Kevin", "Carol",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller",
+    "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez",
+    "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark",
+    "Ramirez", "Lewis", "Robinson", "Walker", "Young", "Allen", "King",
+    "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores", "Green",
+]
+TITLE_WORDS = [
+    "Night", "Return", "Last", "City", "Dark", "Love", "War", "Secret",
+    "River", "Star", "Journey", "Shadow", "Kingdom", "Storm", "Blood",
+    "Silent", "Golden", "Lost", "Empire", "Fire", "Dream", "Ghost",
+]
+
+
+def power_law(rng, minimum, alpha, maximum):
+    """
+    Draw an int >= `minimum` from a Pareto tail with exponent `alpha`,
+    capped at `maximum`.
+    """
+    value = int(minimum * (1 - rng.random()) ** (-1 / (alpha - 1)))
+    return min(value, maximum)
+
+
+def generate(directory, num_people, num_movies=None, seed=0,
+             cast_alpha=2.5, popularity_alpha=2.1):
+    """
+    Write people.csv, movies.csv and stars.csv to `directory`.
+
+    Cast sizes follow a power law with exponent `cast_alpha`, and each
+    cast is drawn from people weighted by a power-law popularity with
+    exponent `popularity_alpha`, so a few prolific actors appear in a
+    great many movies while most appear in one or two. Names repeat,
+    as in the real data.
+    """
+    rng = random.Random(seed)
+    if num_movies is None:
+        num_movies = max(1, num_people // 2)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "people.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(num_people):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            if rng.random() < 0.5:
+                name += f" {rng.choice(LAST_NAMES)}"
+            birth = rng.randint(1900, 2010) if rng.random() < 0.8 else ""
+            writer.writerow([i + 1, name, birth])
+
+    with open(os.path.join(directory, "movies.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerow(["id", "title", "year"])
+        for i in range(num_movies):
+            title = " ".join(rng.sample(TITLE_WORDS, rng.randint(1, 3)))
+            writer.writerow([i + 1, title, rng.randint(1920, 2024)])
+
+    # Popularity weights, shuffled so popular people are spread over ids
+    weights = [(k + 1) ** (-1 / (popularity_alpha - 1)) for k in range(num_people)]
+    rng.shuffle(weights)
+    cumulative = list(accumulate(weights))
+    population = range(1, num_people + 1)
+
+    with open(os.path.join(directory, "stars.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie_id in range(1, num_movies + 1):
+            cast = power_law(rng, 3, cast_alpha, min(200, num_people))
+            for person_id in set(rng.choices(population, cum_weights=cumulative, k=cast)):
+                writer.writerow([person_id, movie_id])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic IMDB-like dataset for degrees.py")
+    parser.add_argument("directory")
+    parser.add_argument("--people", type=int, default=100000)
+    parser.add_argument("--movies", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate(args.directory, args.people, args.movies, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,9 @@
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
 class Node():
     def __init__(self, state, parent, action, ):
         self.state = state
@@ -36,3 +42,121 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class NeighborIndex():
+    """
+    Memoizes a neighbor function as immutable tuples.
+
+    With `max_bytes` set, entries are evicted least recently used
+    first once their estimated size passes the cap; otherwise every
+    computed entry is kept. `hits` and `misses` count lookups.
+    """
+
+    def __init__(self, compute, max_bytes=None):
+        self.compute = compute
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            if self.max_bytes is not None:
+                self.entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        entry = tuple(self.compute(key))
+        self._store(key, entry)
+        return entry
+
+    def precompute(self, keys):
+        """
+        Compute and keep the entry for every key, ignoring the cap.
+        """
+        self.max_bytes = None
+        for key in keys:
+            if key not in self.entries:
+                self._store(key, tuple(self.compute(key)))
+
+    def discard(self, key):
+        """
+        Drop the cached entry for `key`, if any.
+        """
+        if key in self.entries:
+            del self.entries[key]
+            self.size -= self.sizes.pop(key)
+
+    def clear(self):
+        """
+        Drop every cached entry, e.g. after the data is reloaded.
+        """
+        self.entries.clear()
+        self.sizes.clear()
+        self.size = 0
+
+    def _store(self, key, entry):
+        size = sys.getsizeof(entry) + sum(sys.getsizeof(item) for item in entry)
+        self.entries[key] = entry
+        self.sizes[key] = size
+        self.size += size
+        if self.max_bytes is not None:
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                oldest, _ = self.entries.popitem(last=False)
+                self.size -= self.sizes.pop(oldest)
+
+
+class SearchStats():
+    """
+    Counters and timings filled in by a shortest_path search.
+    """
+
+    def __init__(self):
+        self.expanded = 0
+        self.peak_frontier = 0
+        self.neighbor_calls = 0
+        self.load_seconds = 0.0
+        self.search_seconds = 0.0
+        self.reconstruct_seconds = 0.0
+
+    def expand(self, count, frontier_size, neighbor_calls=None):
+        """
+        Record `count` nodes expanded with `frontier_size` nodes waiting.
+        Each expansion is one neighbor call unless `neighbor_calls` says
+        otherwise, as for searches that batch a whole level.
+        """
+        self.expanded += count
+        self.neighbor_calls += count if neighbor_calls is None else neighbor_calls
+        if frontier_size > self.peak_frontier:
+            self.peak_frontier = frontier_size
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    def __str__(self):
+        return (
+            f"Expanded {self.expanded} nodes with {self.neighbor_calls} neighbor calls, "
+            f"peak frontier {self.peak_frontier}.\n"
+            f"Load {self.load_seconds:.3f}s, search {self.search_seconds:.3f}s, "
+            f"reconstruction {self.reconstruct_seconds:.6f}s."
+        )
+
+
+@contextmanager
+def timed(stats, field):
+    """
+    Add the time spent in the block to `stats.<field>`, if `stats`
+    is not None.
+    """
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(stats, field, getattr(stats, field) + time.perf_counter() - start)
@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+
+import pagerank
+
+
+def peak_rss_mb():
+    """
+    Return this process's peak resident set size in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def l1_error(ranks, reference):
+    """
+    Return the L1 distance between two {page: rank} dicts.
+    """
+    return sum(abs(ranks.get(page, 0) - rank) for page, rank in reference.items())
+
+
+def run(directory, budgets, methods, solvers, seed, damping_factor=pagerank.DAMPING,
+        tolerance=1e-8):
+    """
+    Crawl `directory` once, then time each iteration solver and each
+    sampling method over every sample budget, measuring sampling error
+    against a tightly converged reference. If the directory has an
+    "edges" subdirectory of edge files, the out-of-core iteration over
+    them is timed too. Returns a dict of results.
+    """
+    start = time.perf_counter()
+    corpus = pagerank.crawl(directory)
+    crawl_seconds = time.perf_counter() - start
+    reference = pagerank.sparse_pagerank(corpus, damping_factor, tolerance=1e-12,
+                                         max_iterations=10000)
+
+    results = {
+        "directory": directory,
+        "pages": len(corpus),
+        "links": sum(len(links) for links in corpus.values()),
+        "dangling": sum(not links for links in corpus.values()),
+        "seed": seed,
+        "crawl_s": round(crawl_seconds, 3),
+        "iteration": {},
+        "sampling": {},
+    }
+
+    for solver in solvers:
+        sweeps = []
+        start = time.perf_counter()
+        ranks = pagerank.iterate_pagerank(
+            corpus, damping_factor, backend="sparse", solver=solver, tolerance=tolerance,
+            callback=lambda iteration, residual, seconds: sweeps.append(residual))
+        results["iteration"][solver] = {
+            "wall_s": round(time.perf_counter() - start, 3),
+            "iterations": len(sweeps),
+            "final_residual": sweeps[-1] if sweeps else None,
+            "l1_error": l1_error(ranks, reference),
+        }
+
+    edges = os.path.join(directory, "edges")
+    if os.path.isdir(edges):
+        start = time.perf_counter()
+        ranks = pagerank.mmap_pagerank(edges, damping_factor, tolerance=tolerance)
+        results["iteration"]["mmap"] = {
+            "wall_s": round(time.perf_counter() - start, 3),
+            "l1_error": l1_error(ranks, reference),
+        }
+
+    for method in methods:
+        results["sampling"][method] = {}
+        for n in budgets:
+            start = time.perf_counter()
+            ranks = pagerank.sample_pagerank(corpus, damping_factor, n, method=method,
+                                             rng=random.Random(seed))
+            results["sampling"][method][n] = {
+                "wall_s": round(time.perf_counter() - start, 3),
+                "l1_error": round(l1_error(ranks, reference), 6),
+            }
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark crawling, sampling and iterating a pagerank corpus")
+    parser.add_argument("directory")
+    parser.add_argument("--samples", default="10000,100000,1000000",
+                        help="comma-separated sample budgets")
+    parser.add_argument("--methods", default="alias,walkers",
+                        help="comma-separated sample_pagerank methods to time")
+    parser.add_argument("--solvers", default=",".join(pagerank.SOLVERS),
+                        help="comma-separated iterate_pagerank solvers to time")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    budgets = [int(n) for n in args.samples.split(",")]
+    results = run(args.directory, budgets, args.methods.split(","),
+                  args.solvers.split(","), args.seed)
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
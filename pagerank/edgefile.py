@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+
+PAGES = "pages.txt"
+OFFSETS = "offsets.int64"
+SOURCES = "src.int32"
+TARGETS = "dst.int32"
+
+# Edges (or pages) handled per block when streaming over the files
+BLOCK = 1 << 22
+
+
+def write_edge_files(corpus, directory):
+    """
+    Write a corpus dict to `directory` as an on-disk edge list:
+    pages.txt names the pages in index order, src.int32 and
+    dst.int32 hold every link sorted by source then target, and
+    offsets.int64 holds n + 1 offsets so the links of page i are
+    edges offsets[i]..offsets[i + 1].
+    """
+    os.makedirs(directory, exist_ok=True)
+    pages = sorted(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+
+    with open(os.path.join(directory, PAGES), "w", encoding="utf-8") as f:
+        for page in pages:
+            f.write(page + "\n")
+
+    offsets = np.zeros(len(pages) + 1, dtype=np.int64)
+    with open(os.path.join(directory, SOURCES), "wb") as src, \
+            open(os.path.join(directory, TARGETS), "wb") as dst:
+        for i, page in enumerate(pages):
+            links = sorted({index[link] for link in corpus[page] if link in index})
+            np.full(len(links), i, dtype=np.int32).tofile(src)
+            np.array(links, dtype=np.int32).tofile(dst)
+            offsets[i + 1] = offsets[i] + len(links)
+    offsets.tofile(os.path.join(directory, OFFSETS))
+
+
+class EdgeFiles():
+    """
+    Memory-mapped view of an edge list written by write_edge_files.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.offsets = np.memmap(os.path.join(directory, OFFSETS), dtype=np.int64, mode="r")
+        self.num_pages = len(self.offsets) - 1
+        num_edges = int(self.offsets[-1])
+        if num_edges:
+            self.sources = np.memmap(os.path.join(directory, SOURCES), dtype=np.int32, mode="r")
+            self.targets = np.memmap(os.path.join(directory, TARGETS), dtype=np.int32, mode="r")
+        else:
+            self.sources = self.targets = np.zeros(0, dtype=np.int32)
+
+    def pages(self):
+        with open(os.path.join(self.directory, PAGES), encoding="utf-8") as f:
+            return [line.rstrip("\n") for line in f]
+
+    def pagerank(self, damping_factor, tolerance=1e-6, max_iterations=1000, block=BLOCK):
+        """
+        Return the PageRank vector, streaming over the edge files in
+        blocks of `block` edges. Only the current and next rank
+        vectors are held in memory; out-degrees are read from the
+        mapped offsets block by block.
+        """
+        n = self.num_pages
+        ranks = np.full(n, 1 / n)
+        updated = np.empty(n)
+        for _ in range(max_iterations):
+            # Rank held by pages without links is spread over all pages
+            dangling_mass = 0.0
+            for start in range(0, n, block):
+                stop = min(n, start + block)
+                degree = np.diff(self.offsets[start:stop + 1])
+                dangling_mass += ranks[start:stop][degree == 0].sum()
+            updated.fill((1 - damping_factor) / n + damping_factor * dangling_mass / n)
+
+            for start in range(0, len(self.sources), block):
+                sources = np.asarray(self.sources[start:start + block])
+                targets = np.asarray(self.targets[start:start + block])
+                degree = self.offsets[sources + 1] - self.offsets[sources]
+                np.add.at(updated, targets, damping_factor * ranks[sources] / degree)
+
+            change = 0.0
+            for start in range(0, n, block):
+                change += np.abs(updated[start:start + block] - ranks[start:start + block]).sum()
+            ranks, updated = updated, ranks
+            if change < tolerance:
+                break
+        return ranks
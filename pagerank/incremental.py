@@ -0,0 +1,157 @@
+import numpy as np
+
+from linkgraph import LinkGraph
+
+
+class IncrementalPageRank():
+    """
+    PageRank of a corpus kept up to date as its links change.
+
+    Scores are kept unnormalized, as the solution of x = 1 + d * A x
+    where A follows links and pages without links keep what they
+    receive; PageRank is x / sum(x). `residual` holds
+    1 + d * A x - x, which is zero at the solution. Changing the links
+    of page u only moves d * x[u] between u's old and new targets, so
+    an update patches those rows of the compiled graph, adjusts the
+    residual of the pages touched, and pushes residual outwards from
+    them alone. The corpus must change only through update.
+    """
+
+    def __init__(self, corpus, damping_factor, ranks=None):
+        self.corpus = corpus
+        self.damping_factor = damping_factor
+        self.graph = LinkGraph.from_corpus(corpus)
+
+        # Scale the ranks so that the 1 - d teleport plus the rank
+        # spread from pages without links comes to 1 on every page
+        if ranks is None:
+            ranks = self.graph.uniform()
+        else:
+            from pagerank import _warm_start
+
+            ranks = _warm_start(self.graph, ranks)
+        spread = damping_factor * ranks[self.graph.dangling].sum() + 1 - damping_factor
+        self.scores = ranks * len(self.graph) / spread
+        self.residual = 1 + self._flow(self.scores) - self.scores
+        self.pending = np.arange(len(self.graph))
+        self.settled = np.inf
+
+    def update(self, diff):
+        """
+        Apply `diff`, mapping a page to its new set of links or to None
+        if the page was removed, to the corpus in place and to the
+        compiled graph, leaving the residual of every page touched in
+        `pending`. Links to pages outside the corpus, or removed by the
+        same diff, are dropped.
+        """
+        graph = self.graph
+        removed = {page for page, links in diff.items() if links is None and page in graph.index}
+        changed = {page: links for page, links in diff.items() if links is not None}
+
+        added = [page for page in changed if page not in graph.index]
+        if added:
+            indexes = graph.add_pages(added)
+            self.scores = np.concatenate([self.scores, np.zeros(len(added))])
+            self.residual = np.concatenate([self.residual, np.ones(len(added))])
+            self.pending = np.concatenate([self.pending, indexes])
+
+        rows = {}
+        for page, links in changed.items():
+            changed[page] = {link for link in links if link in graph.index and link not in removed}
+            rows[graph.index[page]] = [graph.index[link] for link in changed[page]]
+        linkers = []
+        if removed:
+            gone = np.array([graph.index[page] for page in removed])
+            for i in np.unique(graph.sources[np.isin(graph.targets, gone)]):
+                if graph.pages[i] not in removed and i not in rows:
+                    linkers.append(graph.pages[i])
+                    targets = graph.targets[graph.offsets[i]:graph.offsets[i + 1]]
+                    rows[i] = targets[~np.isin(targets, gone)]
+            for i in gone:
+                rows[i] = []
+
+        # Move each changed page's outgoing score from its old to its new targets
+        touched = [self.pending]
+        for i, targets in rows.items():
+            old = graph.targets[graph.offsets[i]:graph.offsets[i + 1]]
+            new = np.unique(np.asarray(targets, dtype=np.int32))
+            if len(old):
+                self.residual[old] -= self.damping_factor * self.scores[i] / len(old)
+            if len(new):
+                self.residual[new] += self.damping_factor * self.scores[i] / len(new)
+            touched += [old, new]
+        if rows:
+            graph.set_links(rows)
+        self.pending = np.unique(np.concatenate(touched).astype(np.int64))
+
+        if removed:
+            keep = graph.remove_pages(gone)
+            renumber = np.cumsum(keep) - 1
+            self.scores = self.scores[keep]
+            self.residual = self.residual[keep]
+            self.pending = renumber[self.pending[keep[self.pending]]]
+
+        for page, links in changed.items():
+            self.corpus[page] = links
+        for page in linkers:
+            self.corpus[page] = set(self.corpus[page]) - removed
+        for page in removed:
+            self.corpus.pop(page, None)
+
+    def push(self, tolerance):
+        """
+        Settle the residual by pushing it along links from the pending
+        pages, in rounds over only the pages whose residual exceeds
+        their share of `tolerance`, until the ranks are within
+        `tolerance` of PageRank in L1.
+        """
+        # Every score is at least 1, so residuals below this keep the
+        # normalized error within tolerance
+        threshold = tolerance * (1 - self.damping_factor) / 2
+        candidates = self.pending
+        if threshold < self.settled:
+            # Residuals left by an earlier, looser push may be too large now
+            candidates = np.arange(len(self.graph))
+        self.settled = threshold
+        while len(candidates):
+            active = candidates[np.abs(self.residual[candidates]) > threshold]
+            if not len(active):
+                break
+            amounts = self.residual[active]
+            self.scores[active] += amounts
+            self.residual[active] = 0
+            counts, targets = self.graph.out_links(active)
+            weights = np.repeat(self.damping_factor * amounts * self.graph.inv_out[active], counts)
+            candidates, slots = np.unique(targets, return_inverse=True)
+            self.residual[candidates] += np.bincount(slots, weights=weights,
+                                                     minlength=len(candidates))
+        self.pending = np.zeros(0, dtype=np.int64)
+
+    def power(self, tolerance, max_iterations=1000):
+        """
+        Settle the residual by power iteration over the whole graph,
+        starting from the current scores, until a sweep changes the
+        normalized ranks by less than `tolerance` in L1.
+        """
+        for _ in range(max_iterations):
+            self.scores += self.residual
+            self.residual = 1 + self._flow(self.scores) - self.scores
+            if np.abs(self.residual).sum() < tolerance * self.scores.sum():
+                break
+        self.pending = np.zeros(0, dtype=np.int64)
+        self.settled = np.abs(self.residual).max(initial=0)
+
+    def ranks(self):
+        """
+        Return the current {page: rank} dict.
+        """
+        return self.graph.to_dict(self.scores / self.scores.sum())
+
+    def _flow(self, scores):
+        """
+        Return d * A scores: what every page receives through its
+        in-links, with nothing spread from pages without links.
+        """
+        graph = self.graph
+        weights = (scores * graph.inv_out)[graph.sources]
+        return self.damping_factor * np.bincount(graph.targets, weights=weights, minlength=len(graph))
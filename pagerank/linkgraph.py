@@ -0,0 +1,303 @@
+import math
+from itertools import compress
+
+import numpy as np
+
+# Largest total variation distance from PageRank that walkers may still
+# be at when sample_visits starts counting them
+BURN_IN_TOLERANCE = 1e-4
+
+# gauss_seidel splits the pages into at least this many blocks, and
+# into blocks of at most GAUSS_SEIDEL_BLOCK pages on large graphs
+GAUSS_SEIDEL_BLOCKS = 64
+GAUSS_SEIDEL_BLOCK = 1024
+
+
+class LinkGraph():
+    """
+    A corpus compiled to integer arrays for vectorized PageRank.
+
+    Pages are numbered 0..n-1 in `pages` order. Out-links are stored
+    in CSR form: the pages linked to by page `i` are
+    `targets[offsets[i]:offsets[i + 1]]`, and `sources` holds the
+    linking page of every edge. `inv_out` is 1 / out-degree (0 for
+    pages with no links) and `dangling` marks pages with no links,
+    whose rank is spread evenly over all pages.
+    """
+
+    def __init__(self, pages, offsets, targets):
+        self.pages = pages
+        self.index = {page: i for i, page in enumerate(pages)}
+        self.offsets = offsets
+        self.targets = targets
+        out_degree = np.diff(offsets)
+        self.sources = np.repeat(np.arange(len(pages), dtype=np.int32), out_degree)
+        self.dangling = out_degree == 0
+        self.inv_out = np.zeros(len(pages))
+        self.inv_out[~self.dangling] = 1 / out_degree[~self.dangling]
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Compile a corpus dict mapping each page to the pages it links to.
+        Links to pages outside the corpus are ignored.
+        """
+        pages = sorted(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        offsets = np.zeros(len(pages) + 1, dtype=np.int64)
+        targets = []
+        for i, page in enumerate(pages):
+            links = sorted({index[link] for link in corpus[page] if link in index})
+            targets.extend(links)
+            offsets[i + 1] = offsets[i] + len(links)
+        return cls(pages, offsets, np.array(targets, dtype=np.int32))
+
+    def __len__(self):
+        return len(self.pages)
+
+    def uniform(self):
+        """
+        Return the uniform rank vector 1/n.
+        """
+        return np.full(len(self.pages), 1 / len(self.pages))
+
+    def step(self, ranks, damping_factor, teleport=None):
+        """
+        Return one power-iteration step applied to `ranks`: follow a
+        link with probability `damping_factor`, otherwise jump to a
+        page drawn from `teleport` (uniform if None). Rank on dangling
+        pages is spread over all pages.
+        """
+        n = len(self.pages)
+        result = self.propagate(ranks, damping_factor)
+        if teleport is None:
+            result += (1 - damping_factor) / n
+        else:
+            result += (1 - damping_factor) * teleport
+        return result
+
+    def propagate(self, ranks, damping_factor):
+        """
+        Return the rank each page receives when every page passes on
+        `damping_factor` of its rank through its links, with pages
+        without links spreading theirs over all pages.
+        """
+        n = len(self.pages)
+        flow = np.bincount(self.targets, weights=(ranks * self.inv_out)[self.sources], minlength=n)
+        dangling_mass = ranks[self.dangling].sum()
+        return damping_factor * (flow + dangling_mass / n)
+
+    def block_step(self, ranks, damping_factor, teleports):
+        """
+        Apply one power-iteration step to every column of the n x k
+        matrix `ranks` at once, where column j teleports according to
+        column j of `teleports`. Rank on pages without links also
+        follows the teleport column, as in topic-sensitive PageRank.
+        """
+        if getattr(self, "_by_target", None) is None:
+            # Edges grouped by target, for reduceat over each page's in-links
+            order = np.argsort(self.targets, kind="stable")
+            has_links = np.bincount(self.targets, minlength=len(self.pages)) > 0
+            starts = np.searchsorted(self.targets[order], np.flatnonzero(has_links))
+            self._by_target = (self.sources[order], has_links, starts)
+        sources, has_links, starts = self._by_target
+
+        flow = np.zeros_like(ranks)
+        if len(sources):
+            weighted = ranks[sources] * self.inv_out[sources, None]
+            flow[has_links] = np.add.reduceat(weighted, starts, axis=0)
+        dangling_mass = ranks[self.dangling].sum(axis=0)
+        return damping_factor * flow + (damping_factor * dangling_mass + 1 - damping_factor) * teleports
+
+    def gauss_seidel(self, ranks, damping_factor, block=None):
+        """
+        Update `ranks` in place with one Gauss-Seidel sweep: pages are
+        visited in blocks of `block` and each block is recomputed from
+        the latest values, including those already updated earlier in
+        this sweep. Within a block pages are updated together, so with
+        a single block this is a Jacobi sweep; by default there are at
+        least GAUSS_SEIDEL_BLOCKS blocks of up to GAUSS_SEIDEL_BLOCK
+        pages. The result is rescaled to sum to 1, which keeps rank
+        moving onto pages without links from lagging behind.
+        """
+        n = len(self.pages)
+        if block is None:
+            block = max(1, min(GAUSS_SEIDEL_BLOCK, -(-n // GAUSS_SEIDEL_BLOCKS)))
+        if getattr(self, "_in_links", None) is None:
+            # Edges sorted by target, with CSR offsets over targets
+            order = np.argsort(self.targets, kind="stable")
+            in_offsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.targets, minlength=n), out=in_offsets[1:])
+            self._in_links = (in_offsets, self.sources[order], self.targets[order])
+        in_offsets, sources, targets = self._in_links
+
+        dangling_mass = ranks[self.dangling].sum()
+        for start in range(0, n, block):
+            stop = min(n, start + block)
+            edges = slice(in_offsets[start], in_offsets[stop])
+            flow = np.bincount(targets[edges] - start,
+                               weights=ranks[sources[edges]] * self.inv_out[sources[edges]],
+                               minlength=stop - start)
+            updated = damping_factor * (flow + dangling_mass / n) + (1 - damping_factor) / n
+            dangling = self.dangling[start:stop]
+            dangling_mass += (updated[dangling] - ranks[start:stop][dangling]).sum()
+            ranks[start:stop] = updated
+        ranks /= ranks.sum()
+        return ranks
+
+    def out_links(self, pages):
+        """
+        Return (counts, targets): the number of links of each page in
+        the index array `pages`, and all their targets concatenated in
+        the same order, gathered from the CSR rows.
+        """
+        starts = self.offsets[pages]
+        counts = self.offsets[pages + 1] - starts
+        shifts = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        edges = shifts + np.arange(int(counts.sum()))
+        return counts, self.targets[edges]
+
+    def add_pages(self, pages):
+        """
+        Append `pages`, without links, and return their indexes.
+        """
+        first = len(self.pages)
+        for page in pages:
+            self.index[page] = len(self.pages)
+            self.pages.append(page)
+        added = len(self.pages) - first
+        self.offsets = np.concatenate([self.offsets, np.full(added, self.offsets[-1])])
+        self.inv_out = np.concatenate([self.inv_out, np.zeros(added)])
+        self.dangling = np.concatenate([self.dangling, np.ones(added, dtype=bool)])
+        self._changed()
+        return np.arange(first, len(self.pages))
+
+    def set_links(self, links):
+        """
+        Replace the links of the pages in `links`, a dict mapping a
+        page index to an array of target indexes. The untouched rows
+        are copied across in one concatenation.
+        """
+        pieces = []
+        counts = np.diff(self.offsets)
+        previous = 0
+        for i in sorted(links):
+            targets = np.unique(np.asarray(links[i], dtype=np.int32))
+            pieces.append(self.targets[self.offsets[previous]:self.offsets[i]])
+            pieces.append(targets)
+            counts[i] = len(targets)
+            previous = i + 1
+        pieces.append(self.targets[self.offsets[previous]:])
+        self.targets = np.concatenate(pieces).astype(np.int32)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        changed = np.fromiter(links, dtype=np.int64, count=len(links))
+        self.dangling[changed] = counts[changed] == 0
+        self.inv_out[changed] = 0.0
+        linked = changed[counts[changed] > 0]
+        self.inv_out[linked] = 1 / counts[linked]
+        self._changed()
+
+    def remove_pages(self, removed):
+        """
+        Drop the pages in the index array `removed`, which must have
+        no links to or from them left, renumbering the pages after
+        them. Returns a mask of the pages kept, in old numbering.
+        """
+        keep = np.ones(len(self.pages), dtype=bool)
+        keep[removed] = False
+        renumber = np.cumsum(keep) - 1
+        counts = np.diff(self.offsets)[keep]
+        self.targets = renumber[self.targets].astype(np.int32)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.inv_out = self.inv_out[keep]
+        self.dangling = self.dangling[keep]
+        self.pages = list(compress(self.pages, keep.tolist()))
+        self.index = dict(zip(self.pages, range(len(self.pages))))
+        self._changed()
+        return keep
+
+    def _changed(self):
+        """
+        Rebuild `sources` and drop the in-link orderings cached by
+        block_step and gauss_seidel after the links changed.
+        """
+        self.sources = np.repeat(np.arange(len(self.pages), dtype=np.int32), np.diff(self.offsets))
+        self._by_target = None
+        self._in_links = None
+
+    def to_dict(self, ranks):
+        """
+        Map a rank vector back to {page: rank}.
+        """
+        return dict(zip(self.pages, ranks.tolist()))
+
+    def sample_visits(self, damping_factor, n, walkers=10000, rng=None):
+        """
+        Advance `walkers` random surfers in lockstep until `n` steps
+        have been counted in total, and return the visit count of every
+        page. Each round makes one batched damping coin flip, one
+        batched pick of a random out-link through the CSR offsets, and
+        one batched uniform teleport for surfers that jump or sit on a
+        page without links. `rng` is a numpy Generator.
+
+        Surfers start on uniformly random pages, so the first rounds
+        are not counted: a surfer has teleported at least once with
+        probability 1 - damping_factor ** rounds, after which it is
+        distributed as PageRank, so burn_in_rounds warm-up rounds bring
+        every surfer within BURN_IN_TOLERANCE of it.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        num_pages = len(self.pages)
+        out_degree = np.diff(self.offsets)
+        visits = np.zeros(num_pages, dtype=np.int64)
+        positions = rng.integers(num_pages, size=walkers)
+
+        warm_up = burn_in_rounds(damping_factor)
+        remaining = n
+        while remaining > 0:
+            degree = out_degree[positions]
+            follow = (rng.random(walkers) < damping_factor) & (degree > 0)
+            choice = (rng.random(walkers) * degree).astype(np.int64)
+            jumped = rng.integers(num_pages, size=walkers)
+            if len(self.targets):
+                # Surfers not following a link index a clamped, ignored slot
+                slot = np.minimum(self.offsets[positions] + choice, len(self.targets) - 1)
+                positions = np.where(follow, self.targets[slot], jumped)
+            else:
+                positions = jumped
+
+            if warm_up > 0:
+                warm_up -= 1
+                continue
+            counted = positions if remaining >= walkers else positions[:remaining]
+            visits += np.bincount(counted, minlength=num_pages)
+            remaining -= len(counted)
+        return visits
+
+
+def burn_in_rounds(damping_factor, tolerance=BURN_IN_TOLERANCE):
+    """
+    Return how many steps a surfer starting anywhere needs before its
+    position is within `tolerance` of PageRank in total variation.
+    """
+    if damping_factor <= 0:
+        return 0
+    if damping_factor >= 1:
+        raise ValueError("damping_factor must be below 1 to sample PageRank")
+    return math.ceil(math.log(tolerance) / math.log(damping_factor))
+
+
+def quadratic_extrapolate(x0, x1, x2, x3):
+    """
+    Return the quadratic extrapolation of Kamvar et al. from four
+    successive iterates: fit the iterates to the two leading
+    eigenvectors after the first by least squares and cancel them.
+    """
+    y = np.column_stack([x1 - x0, x2 - x0])
+    gamma = np.linalg.lstsq(y, -(x3 - x0), rcond=None)[0]
+    gamma1, gamma2, gamma3 = gamma[0], gamma[1], 1.0
+    estimate = (gamma1 + gamma2 + gamma3) * x1 + (gamma2 + gamma3) * x2 + gamma3 * x3
+    estimate = np.where(estimate > 0, estimate, x3)
+    return estimate / estimate.sum()
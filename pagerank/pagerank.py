@@ -1,11 +1,30 @@
+import json
+import math
+import multiprocessing
 import os
 import random
 import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 DAMPING = 0.85
 SAMPLES = 10000
 
+# Corpus inherited by forked sampling workers, see parallel_sample_pagerank
+_shared_corpus = None
+
+LINK_PATTERN = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+CHUNK_SIZE = 1 << 16
+
+# File in a corpus directory caching extracted links, see crawl
+LINK_INDEX = "pagerank.links"
+
+# Solvers accepted by sparse_pagerank, and how often the extrapolating
+# one extrapolates
+SOLVERS = ("jacobi", "gauss-seidel", "quadratic")
+EXTRAPOLATION_PERIOD = 10
+
 
 def main():
     if len(sys.argv) != 2:
@@ -21,22 +40,44 @@ def main():
         print(f"  {page}: {ranks[page]:.4f}")
 
 
-def crawl(directory):
+def crawl(directory, workers=1, cache=False):
     """
     Parse a directory of HTML pages and check for links to other pages.
     Return a dictionary where each key is a page, and values are
     a list of all other pages in the corpus that are linked to by the page.
+
+    Files are read in chunks on a pool of `workers` threads. With
+    `cache`, the links found in each file are saved to LINK_INDEX in
+    the directory along with the file's mtime and size, and later
+    crawls only re-parse files whose mtime or size changed.
     """
     pages = dict()
 
-    # Extract all links from HTML files
-    for filename in os.listdir(directory):
-        if not filename.endswith(".html"):
+    index = _load_link_index(directory) if cache else {}
+    stale = []
+    for entry in os.scandir(directory):
+        if not entry.name.endswith(".html"):
             continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
+        stat = entry.stat()
+        cached = index.get(entry.name)
+        if cached is not None and cached["stamp"] == [stat.st_mtime_ns, stat.st_size]:
+            pages[entry.name] = set(cached["links"])
+        else:
+            stale.append((entry.name, [stat.st_mtime_ns, stat.st_size]))
+
+    # Extract all links from HTML files
+    paths = [os.path.join(directory, filename) for filename, _ in stale]
+    if workers > 1:
+        with ThreadPoolExecutor(workers) as pool:
+            extracted = list(pool.map(_extract_links, paths))
+    else:
+        extracted = [_extract_links(path) for path in paths]
+    for (filename, stamp), links in zip(stale, extracted):
+        pages[filename] = links - {filename}
+        index[filename] = {"stamp": stamp, "links": sorted(pages[filename])}
+
+    if cache and (stale or len(index) != len(pages)):
+        _save_link_index(directory, {name: index[name] for name in pages})
 
     # Only include links to other pages in the corpus
     for filename in pages:
@@ -48,6 +89,46 @@ def crawl(directory):
     return pages
 
 
+def _extract_links(path):
+    """
+    Return the set of link targets in the HTML file at `path`,
+    reading it CHUNK_SIZE characters at a time. Text from the last
+    "<" of a chunk on is carried over so tags split across chunks
+    are still matched.
+    """
+    links = set()
+    carry = ""
+    with open(path) as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            text = carry + chunk
+            cut = text.rfind("<")
+            if cut == -1:
+                cut = len(text)
+            links.update(LINK_PATTERN.findall(text, 0, cut))
+            carry = text[cut:]
+    links.update(LINK_PATTERN.findall(carry))
+    return links
+
+
+def _load_link_index(directory):
+    try:
+        with open(os.path.join(directory, LINK_INDEX), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_link_index(directory, index):
+    path = os.path.join(directory, LINK_INDEX)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp, path)
+
+
 def transition_model(corpus, page, damping_factor):
     """
     Return a probability distribution over which page to visit next,
@@ -83,7 +164,7 @@ def transition_model(corpus, page, damping_factor):
 
 
 
-def sample_pagerank(corpus, damping_factor, n):
+def sample_pagerank(corpus, damping_factor, n, method="choices", rng=random, workers=1):
     """
     Return PageRank values for each page by sampling `n` pages
     according to transition model, starting with a page at random.
@@ -91,7 +172,23 @@ def sample_pagerank(corpus, damping_factor, n):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
+
+    `method` "choices" rebuilds the transition model at every step;
+    "alias" draws each step in O(1) from per-page alias tables that
+    are built lazily and cached; "walkers" advances many surfers at
+    once with NumPy (see walker_sample_pagerank). Random numbers come
+    from `rng`. With `workers` > 1 the samples are split across that
+    many processes (see parallel_sample_pagerank).
     """
+    if workers > 1:
+        return parallel_sample_pagerank(corpus, damping_factor, n, workers, method, rng)
+    if method == "alias":
+        return alias_sample_pagerank(corpus, damping_factor, n, rng)
+    if method == "walkers":
+        return walker_sample_pagerank(corpus, damping_factor, n, rng=rng)
+    if method != "choices":
+        raise ValueError(f"unknown sampling method: {method}")
+
     rank = {}
     list_of_pages = list(corpus.keys())
     for i in list_of_pages :
@@ -99,11 +196,11 @@ def sample_pagerank(corpus, damping_factor, n):
 
     for i in range (n) :
         if i == 0 :
-            x = random.choice(list_of_pages)
+            x = rng.choice(list_of_pages)
         
         list_of_page = list(transition_model(corpus, x, damping_factor).keys())
         list_of_p = list(transition_model(corpus, x, damping_factor).values())
-        x = random.choices(list_of_page, list_of_p, k=1)[0]
+        x = rng.choices(list_of_page, list_of_p, k=1)[0]
 
         rank[x] += 1
 
@@ -116,7 +213,82 @@ def sample_pagerank(corpus, damping_factor, n):
 
 
 
-def iterate_pagerank(corpus, damping_factor):
+def alias_sample_pagerank(corpus, damping_factor, n, rng=random):
+    """
+    Return PageRank values estimated by `n` random-surfer steps drawn
+    from cached alias tables over the transition model.
+    """
+    from sampling import AliasSampler
+
+    sampler = AliasSampler(corpus, damping_factor, transition_model)
+    visits = dict.fromkeys(corpus, 0)
+    page = rng.choice(list(corpus))
+    for _ in range(n):
+        page = sampler.next_page(page, rng)
+        visits[page] += 1
+    return {page: count / n for page, count in visits.items()}
+
+
+def walker_sample_pagerank(corpus, damping_factor, n, walkers=10000, rng=random):
+    """
+    Return PageRank values estimated from `n` samples taken by
+    `walkers` random surfers moving in lockstep over the corpus
+    compiled into a LinkGraph. The NumPy generator is seeded from
+    `rng`, so seeding `rng` makes the result reproducible.
+    """
+    import numpy as np
+    from linkgraph import LinkGraph
+
+    graph = LinkGraph.from_corpus(corpus)
+    generator = np.random.default_rng(rng.getrandbits(64))
+    visits = graph.sample_visits(damping_factor, n, min(walkers, n), generator)
+    return graph.to_dict(visits / n)
+
+
+def parallel_sample_pagerank(corpus, damping_factor, n, workers, method="alias", rng=random):
+    """
+    Return PageRank values from `n` samples split as evenly as possible
+    across `workers` forked processes that share the corpus read-only.
+
+    Each worker runs `method` with its own random stream seeded from
+    one draw of `rng` and its worker number, and the visit counts are
+    summed exactly, so a seeded `rng` and a fixed worker count always
+    give the same result.
+    """
+    global _shared_corpus
+    base_seed = rng.getrandbits(64)
+    shares = [
+        (n // workers + (i < n % workers), f"{base_seed}:{i}", method, damping_factor)
+        for i in range(workers)
+    ]
+    _shared_corpus = corpus
+    try:
+        context = multiprocessing.get_context("fork")
+        with context.Pool(workers) as pool:
+            counts = pool.map(_sample_share, shares)
+    finally:
+        _shared_corpus = None
+
+    visits = dict.fromkeys(corpus, 0)
+    for share in counts:
+        for page, count in share.items():
+            visits[page] += count
+    return {page: count / n for page, count in visits.items()}
+
+
+def _sample_share(share):
+    """
+    Take one worker's share of samples and return its visit counts.
+    """
+    n, seed, method, damping_factor = share
+    if n == 0:
+        return {}
+    ranks = sample_pagerank(_shared_corpus, damping_factor, n, method, random.Random(seed))
+    return {page: round(rank * n) for page, rank in ranks.items()}
+
+
+def iterate_pagerank(corpus, damping_factor, backend="dict", tolerance=None,
+                     max_iterations=1000, solver=None, norm=None, callback=None):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
@@ -124,7 +296,31 @@ def iterate_pagerank(corpus, damping_factor):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
+
+    Both backends sweep until the change between sweeps, measured in
+    `norm` (1, 2 or "inf"), is below `tolerance`, or `max_iterations`
+    sweeps are done, calling `callback(iteration, residual, seconds)`
+    after every sweep if given. `backend` "dict" updates pages one at
+    a time, by default until no value moves by more than 0.001 (norm
+    "inf", tolerance 0.001). "sparse" compiles the corpus into a
+    LinkGraph and runs `solver` (see sparse_pagerank), by default with
+    norm 1 and tolerance 1e-6.
     """
+    if backend == "sparse":
+        return sparse_pagerank(corpus, damping_factor, 1e-6 if tolerance is None else tolerance,
+                               max_iterations, solver=solver or "jacobi",
+                               norm=1 if norm is None else norm, callback=callback)
+    if backend != "dict":
+        raise ValueError(f"unknown backend: {backend}")
+    if solver is not None:
+        raise ValueError("solver needs the sparse backend")
+    if tolerance is None:
+        tolerance = 0.001
+    if norm is None:
+        norm = "inf"
+    if norm not in (1, 2, "inf"):
+        raise ValueError(f"unknown norm: {norm}")
+
     pr={}
     link={}
     sum = 0
@@ -143,7 +339,8 @@ def iterate_pagerank(corpus, damping_factor):
         for m in corpus[i]:
             link[m].append(i)
 
-    while True:
+    for iteration in range(1, max_iterations + 1):
+        start = time.perf_counter()
         for i in list_of_pages :
             for m in link[i] :
                 sum = sum + pr[m]/len(list(corpus[m]))
@@ -153,19 +350,265 @@ def iterate_pagerank(corpus, damping_factor):
             sum = 0
             check[i] = abs(x - pr[i])
 
-        c = 0
-        for i in check :
-            if check[i] > .001 :
-                c = 1
+        if norm == "inf":
+            residual = max(check.values())
+        elif norm == 1:
+            residual = math.fsum(check.values())
+        else:
+            residual = math.sqrt(math.fsum(c * c for c in check.values()))
+        if callback is not None:
+            callback(iteration, residual, time.perf_counter() - start)
+        if residual < tolerance:
+            break
+    return pr
+
+
+def sparse_pagerank(corpus, damping_factor, tolerance=1e-6, max_iterations=1000,
+                    initial=None, solver="jacobi", norm=1, callback=None, block=None):
+    """
+    Return PageRank values computed iteratively over the corpus
+    compiled into a LinkGraph, starting from the `initial`
+    {page: rank} dict if given and from 1/n otherwise.
+
+    `solver` is one of:
+      "jacobi"        power iteration, every page from the last sweep
+      "gauss-seidel"  in-place sweeps that reuse values already
+                      updated earlier in the same sweep, over pages
+                      in blocks of `block` (see LinkGraph.gauss_seidel)
+      "quadratic"     power iteration with quadratic extrapolation
+                      every EXTRAPOLATION_PERIOD sweeps, kept only
+                      if the next sweep changes less than the last
+
+    Iteration stops once the change between sweeps, measured with
+    `norm` (1, 2 or "inf"), is below `tolerance`. If given,
+    `callback(iteration, residual, seconds)` is called after every
+    sweep with that change and the time the sweep took.
+    """
+    import numpy as np
+    from linkgraph import LinkGraph, quadratic_extrapolate
+
+    if solver not in SOLVERS:
+        raise ValueError(f"unknown solver: {solver}")
+    order = np.inf if norm == "inf" else norm
+
+    graph = LinkGraph.from_corpus(corpus)
+    ranks = graph.uniform() if initial is None else _warm_start(graph, initial)
+    history = [ranks]
+    fallback = None
+    for iteration in range(1, max_iterations + 1):
+        start = time.perf_counter()
+        if solver == "gauss-seidel":
+            updated = graph.gauss_seidel(ranks.copy(), damping_factor, block)
+        else:
+            updated = graph.step(ranks, damping_factor)
+        residual = float(np.linalg.norm(updated - ranks, order))
+
+        if fallback is not None:
+            # Keep an extrapolation only if the sweep after it moved
+            # less than the sweep before it; otherwise resume from the
+            # plain iterate it replaced
+            plain, plain_residual = fallback
+            fallback = None
+            if residual >= plain_residual:
+                history = []
+                updated = plain
+        history = history[-3:] + [updated]
+
+        # Extrapolate from the last few iterates every EXTRAPOLATION_PERIOD sweeps
+        if (solver == "quadratic" and iteration % EXTRAPOLATION_PERIOD == 0
+                and len(history) == 4 and residual >= tolerance):
+            fallback = (updated, residual)
+            updated = quadratic_extrapolate(*history)
+
+        ranks = updated
+        if callback is not None:
+            callback(iteration, residual, time.perf_counter() - start)
+        if residual < tolerance and fallback is None:
+            break
+    return graph.to_dict(ranks)
+
+
+def mmap_pagerank(directory, damping_factor, tolerance=1e-6, max_iterations=1000):
+    """
+    Return PageRank values for an edge list written to `directory` by
+    edgefile.write_edge_files, iterating over memory-mapped blocks of
+    edges so that only two rank vectors are held in memory.
+    """
+    from edgefile import EdgeFiles
 
-        if c == 0 :
-            return pr
+    edges = EdgeFiles(directory)
+    ranks = edges.pagerank(damping_factor, tolerance, max_iterations)
+    return {page: float(rank) for page, rank in zip(edges.pages(), ranks)}
 
-        
 
-    
+def top_k(corpus, k, damping_factor=DAMPING, tolerance=1e-10, max_iterations=1000):
+    """
+    Return the `k` highest-ranked pages as (page, rank) pairs, best
+    first, stopping power iteration as soon as that list can no
+    longer change.
+
+    After a sweep that moved the ranks by `change` in L1, every rank
+    is within damping_factor / (1 - damping_factor) * change of its
+    limit, summed over all pages. So once consecutive ranks in the
+    top k, and the k-th and the best page outside it, are further
+    apart than that bound, no later sweep can reorder them. The top
+    k + 1 candidates are picked with a partial partition and ordered
+    through a heap, so the full rank vector is never sorted.
+    """
+    import heapq
+    import numpy as np
+    from linkgraph import LinkGraph
+
+    graph = LinkGraph.from_corpus(corpus)
+    n = len(graph)
+    k = min(k, n)
+    ranks = graph.uniform()
+    for _ in range(max_iterations):
+        updated = graph.step(ranks, damping_factor)
+        change = abs(updated - ranks).sum()
+        ranks = updated
+
+        count = min(k + 1, n)
+        candidates = np.argpartition(-ranks, count - 1)[:count]
+        leaders = heapq.nlargest(count, candidates, key=ranks.__getitem__)
+        values = ranks[leaders]
+        bound = damping_factor / (1 - damping_factor) * change
+        if change < tolerance or len(values) < 2 or np.min(values[:-1] - values[1:]) > bound:
+            break
+    return [(graph.pages[i], float(ranks[i])) for i in leaders[:k]]
+
+
+def personalized_pagerank(corpus, damping_factor, teleports, tolerance=1e-6,
+                          max_iterations=1000, block_size=64):
+    """
+    Yield (i, ranks) for each teleport vector in `teleports`, where
+    `ranks` is the personalized PageRank dict for the i-th vector.
+
+    Each teleport vector is a set of seed pages (teleport uniformly
+    among them), a {page: weight} dict, or a row of a matrix whose
+    columns follow the sorted page names. Vectors are solved together
+    as columns of one block power iteration over a single LinkGraph;
+    each is yielded as soon as its own L1 change drops below
+    `tolerance`, so results stream out in order of convergence.
+    """
+    import numpy as np
+    from linkgraph import LinkGraph
+
+    graph = LinkGraph.from_corpus(corpus)
+    n = len(graph)
+    pending = iter(enumerate(teleports))
+    while True:
+        block = []
+        for i, teleport in pending:
+            block.append((i, _teleport_vector(graph, teleport)))
+            if len(block) == block_size:
+                break
+        if not block:
+            return
+
+        ids = [i for i, _ in block]
+        vectors = np.column_stack([vector for _, vector in block])
+        ranks = np.full((n, len(block)), 1 / n)
+        for _ in range(max_iterations):
+            updated = graph.block_step(ranks, damping_factor, vectors)
+            change = abs(updated - ranks).sum(axis=0)
+            ranks = updated
+            done = change < tolerance
+            for j in np.flatnonzero(done):
+                yield ids[j], graph.to_dict(ranks[:, j])
+            keep = ~done
+            ids = [i for i, k in zip(ids, keep) if k]
+            ranks, vectors = ranks[:, keep], vectors[:, keep]
+            if not ids:
+                break
+        for j, i in enumerate(ids):
+            yield i, graph.to_dict(ranks[:, j])
+
+
+def _teleport_vector(graph, teleport):
+    """
+    Return `teleport` as a normalized vector over the pages of `graph`.
+    """
+    import numpy as np
+
+    vector = np.zeros(len(graph))
+    if isinstance(teleport, dict):
+        for page, weight in teleport.items():
+            vector[graph.index[page]] = weight
+    elif isinstance(teleport, (set, frozenset, list, tuple)):
+        for page in teleport:
+            vector[graph.index[page]] = 1
+    else:
+        vector[:] = teleport
+    return vector / vector.sum()
+
+
+def update_pagerank(corpus, damping_factor, ranks, diff=None, method="power",
+                    tolerance=1e-6, max_iterations=1000, state=None):
+    """
+    Return PageRank values for `corpus` after applying `diff`,
+    converging from the previous `ranks` instead of from 1/n.
+
+    `diff` maps a page to its new set of links, or to None if the page
+    was removed; it is applied to `corpus` in place. `method` "power"
+    runs power iteration from the warm start; "push" propagates
+    residuals only from pages whose rank is no longer consistent.
+
+    Without `state` the corpus is compiled afresh. To keep the
+    compiled graph between updates, pass an
+    incremental.IncrementalPageRank built for `corpus` as `state`: it
+    then stands in for `ranks`, and only the rows of the pages in
+    `diff` and of pages linking to removed pages are patched. The
+    corpus must then change only through `diff`.
+    """
+    from incremental import IncrementalPageRank
+
+    if method not in ("power", "push"):
+        raise ValueError(f"unknown update method: {method}")
+    if state is None:
+        state = IncrementalPageRank(corpus, damping_factor, ranks)
+    elif state.corpus is not corpus or state.damping_factor != damping_factor:
+        raise ValueError("state was built for another corpus or damping factor")
+
+    state.update(diff or {})
+    if method == "power":
+        state.power(tolerance, max_iterations)
+    else:
+        state.push(tolerance)
+    return state.ranks()
+
+
+def _warm_start(graph, ranks):
+    """
+    Return `ranks` as a vector over the pages of `graph`, giving new
+    pages 1/n and rescaling so the vector sums to 1.
+    """
+    import numpy as np
 
-    raise NotImplementedError
+    n = len(graph)
+    vector = np.array([ranks.get(page, 1 / n) for page in graph.pages], dtype=float)
+    return vector / vector.sum()
+
+
+def save_ranks(path, ranks):
+    """
+    Save a {page: rank} dict so a later run can warm-start from it.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(ranks, f)
+    os.replace(tmp, path)
+
+
+def load_ranks(path):
+    """
+    Return the {page: rank} dict saved at `path`, or None if missing.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+import random
+
+
+class AliasTable():
+    """
+    Walker/Vose alias table for drawing from a fixed discrete
+    distribution in O(1) per sample.
+    """
+
+    def __init__(self, outcomes, weights):
+        n = len(outcomes)
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        self.outcomes = list(outcomes)
+        self.probability = [1.0] * n
+        self.alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.probability[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1 - scaled[s]
+            (small if scaled[l] < 1 else large).append(l)
+        # Whatever is left has probability 1 up to rounding error
+
+    def sample(self, rng=random):
+        i = int(rng.random() * len(self.outcomes))
+        if rng.random() < self.probability[i]:
+            return self.outcomes[i]
+        return self.outcomes[self.alias[i]]
+
+
+class AliasSampler():
+    """
+    Draws the next page of a random surfer from per-page alias tables
+    over `transition_model`, built the first time each page is left
+    and cached. Pages without links share one uniform draw instead
+    of each holding a table over the whole corpus.
+    """
+
+    def __init__(self, corpus, damping_factor, transition_model):
+        self.corpus = corpus
+        self.damping_factor = damping_factor
+        self.transition_model = transition_model
+        self.pages = list(corpus)
+        self.tables = {}
+
+    def next_page(self, page, rng=random):
+        table = self.tables.get(page)
+        if table is None:
+            if not self.corpus[page]:
+                return rng.choice(self.pages)
+            distribution = self.transition_model(self.corpus, page, self.damping_factor)
+            table = AliasTable(list(distribution), list(distribution.values()))
+            self.tables[page] = table
+        return table.sample(rng)
@@ -0,0 +1,107 @@
+import argparse
+import os
+import random
+from itertools import accumulate
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+    <head>
+        <title>{name}</title>
+    </head>
+    <body>
+        <h1>{name}</h1>
+
+        <div>Links:</div>
+        <ul>
+{links}
+        </ul>
+    </body>
+</html>
+"""
+LINK = """            <li><a href="{page}">{name}</a></li>"""
+
+
+def power_law(rng, minimum, alpha, maximum):
+    """
+    Draw an int >= `minimum` from a Pareto tail with exponent `alpha`,
+    capped at `maximum`.
+    """
+    value = int(minimum * (1 - rng.random()) ** (-1 / (alpha - 1)))
+    return min(value, maximum)
+
+
+def generate_corpus(num_pages, seed=0, out_alpha=2.5, in_alpha=2.1, dangling=0.1):
+    """
+    Return a corpus dict of `num_pages` pages named 1.html, 2.html, ...
+
+    A `dangling` fraction of pages has no links. The others have a
+    power-law number of links with exponent `out_alpha`, whose
+    targets are drawn by a power-law popularity with exponent
+    `in_alpha`, so in-degrees are heavy-tailed too: a few pages are
+    linked to from everywhere while most have one or two in-links.
+    """
+    rng = random.Random(seed)
+    pages = [f"{i + 1}.html" for i in range(num_pages)]
+
+    # Popularity weights, shuffled so popular pages are spread over names
+    weights = [(k + 1) ** (-1 / (in_alpha - 1)) for k in range(num_pages)]
+    rng.shuffle(weights)
+    cumulative = list(accumulate(weights))
+
+    corpus = {}
+    for page in pages:
+        if rng.random() < dangling or num_pages == 1:
+            corpus[page] = set()
+            continue
+        count = power_law(rng, 1, out_alpha, min(1000, num_pages - 1))
+        corpus[page] = set(rng.choices(pages, cum_weights=cumulative, k=count)) - {page}
+    return corpus
+
+
+def write_html(corpus, directory):
+    """
+    Write every page of `corpus` to `directory` as an HTML file in the
+    format of the bundled corpora.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for page, links in corpus.items():
+        with open(os.path.join(directory, page), "w", encoding="utf-8") as f:
+            f.write(PAGE.format(
+                name=page[:-len(".html")],
+                links="\n".join(LINK.format(page=link, name=link[:-len(".html")])
+                                for link in sorted(links))
+            ))
+
+
+def generate(directory, num_pages, seed=0, html=True, edges=True, **options):
+    """
+    Generate a corpus (see generate_corpus) and write it to
+    `directory` as HTML pages and/or as edge files in an "edges"
+    subdirectory (see edgefile.write_edge_files). Returns the corpus.
+    """
+    corpus = generate_corpus(num_pages, seed, **options)
+    if html:
+        write_html(corpus, directory)
+    if edges:
+        from edgefile import write_edge_files
+
+        write_edge_files(corpus, os.path.join(directory, "edges"))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic power-law web graph for pagerank.py")
+    parser.add_argument("directory")
+    parser.add_argument("--pages", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dangling", type=float, default=0.1)
+    parser.add_argument("--no-html", action="store_true")
+    parser.add_argument("--no-edges", action="store_true")
+    args = parser.parse_args()
+    generate(args.directory, args.pages, args.seed,
+             html=not args.no_html, edges=not args.no_edges, dangling=args.dangling)
+
+
+if __name__ == "__main__":
+    main()